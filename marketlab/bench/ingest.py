@@ -0,0 +1,153 @@
+# marketlab/bench/ingest.py
+"""
+Ingestion benchmarks over synthetic flatfiles.
+
+Each case runs in a fresh (spawned) process against its own empty LMDB
+store, so wall time and peak RSS are not polluted by earlier cases. rows/sec
+is computed from the rows present in the generated files.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import multiprocessing as mp
+import resource
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from pathlib import Path
+
+from marketlab.bench.synthetic import SyntheticSpec, write_synthetic_flatfiles
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import convert_flatfile
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path, ingest_day
+from marketlab.data.polygon_massive.ingest_daily_monthly import ingest_month, month_range
+from marketlab.data.polygon_massive.pipeline import month_batches, run_pipeline
+from marketlab.data.polygon_massive.session import IngestSession
+from marketlab.data.polygon_massive.streaming import ingest_streaming, peak_rss_bytes
+
+CASES = ["ingest_day", "ingest_month", "backfill", "backfill_streaming"]
+
+def bench_config(root: Path, *, sidecars: bool = False) -> MarketlabConfig:
+    """A config whose cache, store and checkpoints all live under `root`."""
+    return replace(
+        MarketlabConfig(),
+        massive_cache_dir=root / "cache",
+        arctic_uri=f"lmdb://{root / 'store'}",
+        checkpoint_dir=root / "checkpoints",
+        flatfile_sidecars=sidecars,
+    )
+
+def _peak_rss_all() -> int:
+    return max(peak_rss_bytes(), peak_rss_bytes(resource.RUSAGE_CHILDREN))
+
+def _run_case(case: str, cfg: MarketlabConfig, days: list[dt.date], workers: int, max_memory: int) -> dict:
+    start, end = days[0], days[-1]
+    written = 0
+    failures = 0
+    t0 = time.perf_counter()
+    if case == "ingest_day":
+        session = IngestSession.open(cfg)
+        for d in days:
+            info = ingest_day(cfg, d, session=session)
+            written += info["rows_total"]
+            failures += len(info.get("failed_symbols", {}))
+        session.commit()
+    elif case == "ingest_month":
+        session = IngestSession.open(cfg)
+        for year, month in month_range(start, end):
+            info = ingest_month(cfg, year, month, start, end, session=session)
+            written += info["rows_appended"]
+            failures += len(info.get("failed_symbols", {}))
+    elif case == "backfill":
+        for info in run_pipeline(cfg, month_batches(start, end), workers=workers):
+            written += info["rows_appended"]
+            failures += len(info.get("failed_symbols", {}))
+    elif case == "backfill_streaming":
+        for info in ingest_streaming(cfg, days, max_memory=max_memory):
+            written += info["rows_appended"]
+            failures += len(info.get("failed_symbols", {}))
+    else:
+        raise ValueError(f"Unknown benchmark case: {case}")
+    elapsed = time.perf_counter() - t0
+
+    return {"seconds": elapsed, "rows_written": written, "failed_symbols": failures, "peak_rss_bytes": _peak_rss_all()}
+
+def run_benchmarks(
+    root: Path,
+    spec: SyntheticSpec,
+    *,
+    cases: list[str] | None = None,
+    workers: int = 2,
+    max_memory: int = 256 << 20,
+    sidecars: bool = False,
+) -> dict:
+    """
+    Generate `spec` under `root` and run each case on an empty store. Returns {"spec": ..., "dataset": ..., "cases": {name: result}}.
+    """
+
+    root = Path(root)
+    cfg = bench_config(root, sidecars=sidecars)
+    gen_t0 = time.perf_counter()
+    data = write_synthetic_flatfiles(cfg, spec)
+    dataset = {
+        "days": len(data.days_written),
+        "rows": data.rows,
+        "bytes": data.bytes,
+        "generate_seconds": round(time.perf_counter() - gen_t0, 3),
+    }
+    if not data.days_written:
+        raise ValueError("Synthetic spec produced no days")
+    if sidecars:
+        for d in data.days_written:
+            convert_flatfile(flatfile_path(cfg, d))
+
+    results = {}
+    ctx = mp.get_context("spawn")
+    for case in cases or CASES:
+        for sub in ("store", "checkpoints"):
+            shutil.rmtree(root / sub, ignore_errors=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+            r = ex.submit(_run_case, case, cfg, data.days_written, workers, max_memory).result()
+        r["rows_per_sec"] = round(data.rows / r["seconds"]) if r["seconds"] > 0 else None
+        r["seconds"] = round(r["seconds"], 3)
+        results[case] = r
+
+    spec_d = {k: (v.isoformat() if isinstance(v, dt.date) else v) for k, v in asdict(spec).items()}
+    spec_d["missing_days"] = [d.isoformat() for d in spec.missing_days]
+    return {"spec": spec_d, "dataset": dataset, "workers": workers, "sidecars": sidecars, "cases": results}
+
+def save_baseline(report: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+def load_baseline(path: Path) -> dict | None:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else None
+
+def compare_to_baseline(report: dict, baseline: dict, *, tolerance: float = 0.15) -> list[dict]:
+    """
+    One row per case present in both: throughput and peak-RSS ratios against
+    the baseline, flagged as a regression when throughput drops or memory grows
+    by more than `tolerance`.
+    """
+    rows = []
+    same_input = report["spec"] == baseline.get("spec")
+    for case, cur in report["cases"].items():
+        base = baseline.get("cases", {}).get(case)
+        if not base:
+            continue
+        rps = cur["rows_per_sec"] / base["rows_per_sec"] if base.get("rows_per_sec") else None
+        rss = cur["peak_rss_bytes"] / base["peak_rss_bytes"] if base.get("peak_rss_bytes") else None
+        rows.append({
+            "case": case,
+            "rows_per_sec": cur["rows_per_sec"],
+            "baseline_rows_per_sec": base.get("rows_per_sec"),
+            "throughput_ratio": None if rps is None else round(rps, 3),
+            "peak_rss_ratio": None if rss is None else round(rss, 3),
+            "regression": (rps is not None and rps < 1 - tolerance) or (rss is not None and rss > 1 + tolerance),
+            "same_input": same_input,
+        })
+    return rows
@@ -0,0 +1,94 @@
+# marketlab/bench/profiles.py
+"""
+Store size and read latency of the bar dtype profiles (see data/bar_profile.py).
+
+The same synthetic flatfiles are ingested once per profile into separate LMDB
+stores; each store is then measured on disk and read back symbol by symbol
+(full history, and the last `tail` closes) with the bar cache bypassed.
+"""
+from __future__ import annotations
+
+import shutil
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from marketlab.bench.ingest import bench_config
+from marketlab.bench.synthetic import SyntheticSpec, write_synthetic_flatfiles
+from marketlab.data.arctic import get_arctic, get_lib, read_bars, read_bars_many
+from marketlab.data.bar_profile import PROFILES
+from marketlab.data.polygon_massive.ingest_daily_monthly import ingest_month, month_range
+from marketlab.data.polygon_massive.session import IngestSession
+from marketlab.data.symbol_catalog import stored_symbols
+
+def dir_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+def _timed(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def compare_profiles(
+    root: Path,
+    spec: SyntheticSpec,
+    *,
+    profiles: tuple[str, ...] = PROFILES,
+    read_symbols: int = 200,
+    tail: int = 300,
+    repeats: int = 3,
+) -> dict:
+    """{"dataset": ..., "profiles": {name: {...}}}; latencies are best-of-`repeats` seconds."""
+    root = Path(root)
+    data = write_synthetic_flatfiles(bench_config(root), spec)
+    if not data.days_written:
+        raise ValueError("Synthetic spec produced no days")
+    start, end = data.days_written[0], data.days_written[-1]
+
+    results = {}
+    for profile in profiles:
+        store = root / f"store_{profile}"
+        shutil.rmtree(store, ignore_errors=True)
+        shutil.rmtree(root / "checkpoints", ignore_errors=True)
+        cfg = replace(bench_config(root), arctic_uri=f"lmdb://{store}", bar_profile=profile)
+
+        t0 = time.perf_counter()
+        session = IngestSession.open(cfg)
+        rows = rejected = 0
+        for year, month in month_range(start, end):
+            info = ingest_month(cfg, year, month, start, end, session=session)
+            rows += info["rows_appended"]
+            rejected += info.get("rows_rejected", 0)
+        ingest_s = time.perf_counter() - t0
+
+        lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
+        symbols = stored_symbols(lib, cfg)[:read_symbols]
+        full = _timed(lambda: [read_bars(lib, "1d", s, cache=False) for s in symbols], repeats)
+        last = _timed(lambda: [read_bars(lib, "1d", s, columns=["close"], tail=tail, cache=False) for s in symbols], repeats)
+        batch = _timed(lambda: read_bars_many(lib, "1d", symbols), repeats)
+        sample = read_bars(lib, "1d", symbols[0], cache=False) if symbols else None
+
+        results[profile] = {
+            "store_bytes": dir_bytes(store),
+            "rows_written": rows,
+            "rows_rejected": rejected,
+            "ingest_seconds": round(ingest_s, 3),
+            "symbols_read": len(symbols),
+            "read_full_seconds": round(full, 4),
+            "read_tail_close_seconds": round(last, 4),
+            "read_batch_seconds": round(batch, 4),
+            "dtypes": {} if sample is None else {c: str(t) for c, t in sample.dtypes.items()},
+        }
+
+    base = results.get("float64")
+    if base:
+        for r in results.values():
+            r["store_bytes_ratio"] = round(r["store_bytes"] / base["store_bytes"], 3) if base["store_bytes"] else None
+            r["read_full_ratio"] = round(r["read_full_seconds"] / base["read_full_seconds"], 3) if base["read_full_seconds"] else None
+    return {
+        "dataset": {"days": len(data.days_written), "rows": data.rows, "bytes": data.bytes},
+        "profiles": results,
+    }
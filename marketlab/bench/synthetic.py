@@ -0,0 +1,110 @@
+# marketlab/bench/synthetic.py
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from marketlab.calendar import iter_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path
+
+# day_aggs_v1 column order
+FLATFILE_COLUMNS = ["ticker", "volume", "open", "close", "high", "low", "window_start", "transactions"]
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    start: dt.date
+    end: dt.date
+    n_tickers: int = 1000
+    missing_days: tuple[dt.date, ...] = ()  # sessions with no file (outage, not yet downloaded)
+    missing_frac: float = 0.0  # extra fraction of sessions dropped at random
+    delist_frac: float = 0.05  # fraction of tickers that stop trading partway through
+    list_frac: float = 0.05  # fraction of tickers that start trading partway through
+    seed: int = 0
+
+@dataclass
+class SyntheticResult:
+    days_written: list[dt.date] = field(default_factory=list)
+    rows: int = 0
+    bytes: int = 0
+
+def _ticker_names(n: int) -> np.ndarray:
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    idx = np.arange(n)
+    names = []
+    for i in idx:  # bijective base-26: A..Z, AA..ZZ, ...
+        s = ""
+        i += 1
+        while i:
+            i, r = divmod(i - 1, 26)
+            s = letters[r] + s
+        names.append(s)
+    return np.array(names, dtype=object)
+
+def write_synthetic_flatfiles(cfg: MarketlabConfig, spec: SyntheticSpec) -> SyntheticResult:
+    """
+    Write day_aggs_v1-shaped .csv.gz files for every NYSE session in [start, end]
+    under cfg.massive_cache_dir, with random-walk OHLCV, optional missing days,
+    mid-range listings and delistings.
+    """
+    rng = np.random.default_rng(spec.seed)
+    sessions = list(iter_sessions(spec.start, spec.end))
+    n_days = len(sessions)
+    res = SyntheticResult()
+    if n_days == 0:
+        return res
+
+    tickers = _ticker_names(spec.n_tickers)
+    first = np.zeros(spec.n_tickers, dtype=int)
+    last = np.full(spec.n_tickers, n_days - 1)
+    listed = rng.random(spec.n_tickers) < spec.list_frac
+    delisted = rng.random(spec.n_tickers) < spec.delist_frac
+    first[listed] = rng.integers(0, n_days, listed.sum())
+    last[delisted] = np.maximum(first[delisted], rng.integers(0, n_days, delisted.sum()))
+
+    dropped = set(spec.missing_days)
+    if spec.missing_frac > 0:
+        dropped.update(d for d in sessions if rng.random() < spec.missing_frac)
+
+    catalog = FlatfileCatalog.for_config(cfg)
+    close = rng.uniform(2.0, 500.0, spec.n_tickers)
+    for i, day in enumerate(sessions):
+        ret = rng.normal(0.0, 0.02, spec.n_tickers)
+        open_ = close * np.exp(rng.normal(0.0, 0.005, spec.n_tickers))
+        close = np.maximum(close * np.exp(ret), 0.01)
+        if day in dropped:
+            continue
+
+        alive = (first <= i) & (i <= last)
+        n = int(alive.sum())
+        o, c = open_[alive], close[alive]
+        hi = np.maximum(o, c) * (1 + rng.uniform(0, 0.01, n))
+        lo = np.minimum(o, c) * (1 - rng.uniform(0, 0.01, n))
+        # window_start: session date at 00:00 America/New_York, as ns epoch
+        ts = pd.Timestamp(day, tz="America/New_York").tz_convert("UTC").value
+        df = pd.DataFrame({
+            "ticker": tickers[alive],
+            "volume": rng.integers(100, 50_000_000, n).astype("float64"),
+            "open": o.round(4),
+            "close": c.round(4),
+            "high": hi.round(4),
+            "low": lo.round(4),
+            "window_start": np.full(n, ts, dtype="int64"),
+            "transactions": rng.integers(1, 200_000, n),
+        })[FLATFILE_COLUMNS]
+        # vendor files are not sorted by ticker
+        df = df.iloc[rng.permutation(n)]
+
+        path = flatfile_path(cfg, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, index=False, compression="gzip")
+        catalog.record_download(day, path)
+        res.days_written.append(day)
+        res.rows += n
+        res.bytes += path.stat().st_size
+
+    return res
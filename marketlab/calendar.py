@@ -0,0 +1,120 @@
+# marketlab/calendar.py
+"""
+NYSE trading sessions, generated offline from rules:
+
+  - weekends
+  - New Year's Day, Independence Day, Christmas (Saturday -> Friday,
+    Sunday -> Monday; a Saturday New Year's Day is not observed)
+  - MLK Day (3rd Monday of January, from 1998), Washington's Birthday
+    (3rd Monday of February), Good Friday, Memorial Day (last Monday of May),
+    Juneteenth (observed, from 2022), Labor Day (1st Monday of September),
+    Thanksgiving (4th Thursday of November)
+  - SPECIAL_CLOSURES: unscheduled full-day closures (storms, national mourning)
+
+Ranges are evaluated with numpy's business-day machinery, so a multi-year
+session list costs one vectorized mask instead of a per-day loop. Early
+closes (half days) are sessions and are not modelled.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import numpy as np
+
+SPECIAL_CLOSURES = frozenset({
+    dt.date(1985, 9, 27),  # Hurricane Gloria
+    dt.date(1994, 4, 27),  # President Nixon funeral
+    dt.date(2001, 9, 11),  # September 11
+    dt.date(2001, 9, 12),
+    dt.date(2001, 9, 13),
+    dt.date(2001, 9, 14),
+    dt.date(2004, 6, 11),  # President Reagan funeral
+    dt.date(2007, 1, 2),  # President Ford funeral
+    dt.date(2012, 10, 29),  # Hurricane Sandy
+    dt.date(2012, 10, 30),
+    dt.date(2018, 12, 5),  # President G.H.W. Bush funeral
+    dt.date(2025, 1, 9),  # President Carter funeral
+})
+
+def _easter(year: int) -> dt.date:
+    # anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    """n-th (1-based) `weekday` (Mon=0) of the month; n=-1 for the last one."""
+    if n > 0:
+        first = dt.date(year, month, 1)
+        return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    nxt = dt.date(year + month // 12, month % 12 + 1, 1)
+    last = nxt - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+def _observed(day: dt.date) -> dt.date:
+    if day.weekday() == 5:
+        return day - dt.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + dt.timedelta(days=1)
+    return day
+
+@lru_cache(maxsize=None)
+def holidays_in_year(year: int) -> frozenset[dt.date]:
+    """Full-day NYSE closures falling on weekdays of `year` (rules + SPECIAL_CLOSURES)."""
+    out = set()
+    ny = dt.date(year, 1, 1)
+    if ny.weekday() != 5:
+        out.add(_observed(ny))
+    if year >= 1998:
+        out.add(_nth_weekday(year, 1, 0, 3))
+    out.add(_nth_weekday(year, 2, 0, 3))
+    out.add(_easter(year) - dt.timedelta(days=2))
+    out.add(_nth_weekday(year, 5, 0, -1))
+    if year >= 2022:
+        out.add(_observed(dt.date(year, 6, 19)))
+    out.add(_observed(dt.date(year, 7, 4)))
+    out.add(_nth_weekday(year, 9, 0, 1))
+    out.add(_nth_weekday(year, 11, 3, 4))
+    out.add(_observed(dt.date(year, 12, 25)))
+    out.update(d for d in SPECIAL_CLOSURES if d.year == year)
+    return frozenset(d for d in out if d.year == year and d.weekday() < 5)
+
+def _holiday_array(start: dt.date, end: dt.date) -> np.ndarray:
+    days = sorted(d for y in range(start.year, end.year + 1) for d in holidays_in_year(y))
+    return np.array(days, dtype="datetime64[D]")
+
+def sessions(start: dt.date, end: dt.date) -> np.ndarray:
+    """Sessions in [start, end] as a sorted datetime64[D] array."""
+    if end < start:
+        return np.array([], dtype="datetime64[D]")
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    return days[np.is_busday(days, holidays=_holiday_array(start, end))]
+
+def iter_sessions(start: dt.date, end: dt.date) -> Iterator[dt.date]:
+    yield from sessions(start, end).astype(object)
+
+def is_session(day: dt.date) -> bool:
+    return day.weekday() < 5 and day not in holidays_in_year(day.year)
+
+def previous_session(day: dt.date) -> dt.date:
+    """Latest session strictly before `day`."""
+    d = day - dt.timedelta(days=1)
+    while not is_session(d):
+        d -= dt.timedelta(days=1)
+    return d
+
+def missing_sessions(start: dt.date, end: dt.date, present: Iterable[dt.date]) -> list[dt.date]:
+    """Sessions in [start, end] that are not in `present`."""
+    expected = sessions(start, end)
+    have = np.array(sorted(set(present)), dtype="datetime64[D]")
+    return list(expected[~np.isin(expected, have)].astype(object))
@@ -33,10 +33,33 @@ class MarketlabConfig:
     massive_endpoint: str = os.getenv("MASSIVE_S3_ENDPOINT", "https://files.massive.com")
     massive_bucket: str = os.getenv("MASSIVE_S3_BUCKET", "flatfiles")
 
+    # Downloads: concurrent GETs (also the client's connection pool size) and retries on throttling
+    download_workers: int = int(os.getenv("MARKETLAB_DOWNLOAD_WORKERS", "8"))
+    download_max_retries: int = int(os.getenv("MARKETLAB_DOWNLOAD_MAX_RETRIES", "6"))
+
     # Local cache dirs
     cache_dir: Path = Path(os.getenv("MARKETLAB_CACHE_DIR", "./massive_flatfiles")).resolve()
     kenfrench_dir: Path = Path(os.getenv("MARKETLAB_KENFRENCH_DIR", "./factors/ken_french")).resolve()
 
+    # Ingestion: symbols per ArcticDB write_batch / append_batch call
+    ingest_batch_size: int = int(os.getenv("MARKETLAB_INGEST_BATCH_SIZE", "1000"))
+    # Ingestion: read flatfiles through typed .arrow sidecars (needs pyarrow)
+    flatfile_sidecars: bool = os.getenv("MARKETLAB_FLATFILE_SIDECARS", "1") != "0"
+
+    # Ingestion: bar dtype profile, "float64" or "compact" (float32 prices, uint volume); see data/bar_profile.py.
+    # Fixed per store: convert an existing one with scripts/convert_bar_profile.py before changing it
+    bar_profile: str = os.getenv("MARKETLAB_BAR_PROFILE", "float64")
+
+    # Ingestion: also maintain wide date x ticker panels per field (dynamic-schema library)
+    wide_panels: bool = os.getenv("MARKETLAB_WIDE_PANELS", "1") != "0"
+    panel_lib: str = os.getenv("MARKETLAB_ARCTIC_LIB_PANELS", "daily_panels")
+
+    # Ingestion: journal of committed write batches, replayed after a crash
+    checkpoint_dir: Path = Path(os.getenv("MARKETLAB_CHECKPOINT_DIR", "./.marketlab_checkpoints")).resolve()
+
+    # Reads: in-process LRU of bar frames used by read_bars (bytes; 0 disables)
+    bar_cache_bytes: int = int(os.getenv("MARKETLAB_BAR_CACHE_BYTES", str(512 << 20)))
+
     # Misc
     max_years_back: int = int(os.getenv("MARKETLAB_MAX_YEARS_BACK", "5"))
 
@@ -1,11 +1,22 @@
 # marketlab/data/arctic.py
 from __future__ import annotations
 
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterable
+
+import numpy as np
 import pandas as pd
-from arcticdb import Arctic
+from arcticdb import Arctic, DataError, QueryBuilder, WritePayload
+from arcticdb.exceptions import NoDataFoundException
+from arcticdb.version_store.library import ReadRequest, UpdatePayload
+from arcticdb_ext.exceptions import ErrorCategory
 import arcticdb as adb
 
 from marketlab.config import MarketlabConfig
+from marketlab.data.bar_cache import BarCache, default_bar_cache
+from marketlab.data.bar_profile import to_profile, upcast_bars
 
 def get_arctic(uri: str) -> Arctic:
     return adb.Arctic(uri)
@@ -17,13 +28,308 @@ def key_bars(timeframe: str, symbol: str) -> str:
     # canonical key naming
     return f"bars/{timeframe}/{symbol}"
 
-def write_bars(lib, timeframe: str, symbol: str, df: pd.DataFrame, upsert: bool = True) -> None:
+def write_bars(
+    lib, timeframe: str, symbol: str, df: pd.DataFrame, upsert: bool = True, profile: str = "float64"
+) -> int:
+    """Write (or append) one symbol's bars under dtype `profile`. Returns rows rejected by the profile."""
     k = key_bars(timeframe, symbol)
+    df, rejected = to_profile(df, profile)
+    if df.empty:
+        return rejected
     if upsert:
         lib.write(k, df, prune_previous_versions=True)
     else:
         lib.append(k, df)
+    return rejected
 
-def read_bars(lib, timeframe: str, symbol: str) -> pd.DataFrame:
-    k = key_bars(timeframe, symbol)
-    return lib.read(k).data
+@dataclass
+class BatchWriteResult:
+    symbols: int = 0
+    rows: int = 0
+    skipped: int = 0  # rows the caller filtered out before writing
+    rejected: int = 0  # rows the dtype profile could not store without loss
+    failures: dict[str, str] = field(default_factory=dict)  # symbol -> error
+
+    def merge(self, other: "BatchWriteResult") -> None:
+        self.symbols += other.symbols
+        self.rows += other.rows
+        self.skipped += other.skipped
+        self.rejected += other.rejected
+        self.failures.update(other.failures)
+
+def write_bars_batch(
+    lib,
+    timeframe: str,
+    frames: Iterable[tuple[str, pd.DataFrame]],
+    *,
+    upsert: bool = False,
+    update: bool = False,
+    profile: str = "float64",
+    batch_size: int = 1000,
+    on_batch: Callable[[list[tuple[str, pd.DataFrame]]], None] | None = None,
+) -> BatchWriteResult:
+    """
+    write_bars for many symbols, grouped into write_batch / append_batch calls
+    of `batch_size` payloads (update_batch with update=True: each frame
+    replaces the stored rows in its own date range, creating missing symbols).
+    Frames are cast to dtype `profile` first (see bar_profile); rows it cannot
+    store losslessly are dropped and counted in `rejected`.
+    A symbol that fails is recorded in `failures` and does not stop the rest
+    of the batch. `on_batch` is called after each storage call with the
+    (symbol, frame) pairs it wrote successfully.
+    """
+    res = BatchWriteResult()
+    pending: list[tuple[str, pd.DataFrame]] = []
+
+    def flush() -> None:
+        if update:
+            payloads = [UpdatePayload(key_bars(timeframe, sym), df) for sym, df in pending]
+            out = lib.update_batch(payloads, upsert=True, prune_previous_versions=True)
+        elif upsert:
+            payloads = [WritePayload(key_bars(timeframe, sym), df) for sym, df in pending]
+            out = lib.write_batch(payloads, prune_previous_versions=True)
+        else:
+            payloads = [WritePayload(key_bars(timeframe, sym), df) for sym, df in pending]
+            out = lib.append_batch(payloads)
+        ok = []
+        for (sym, df), item in zip(pending, out):
+            if isinstance(item, DataError):
+                res.failures[sym] = item.exception_string
+            else:
+                res.symbols += 1
+                res.rows += len(df)
+                ok.append((sym, df))
+        pending.clear()
+        if on_batch is not None and ok:
+            on_batch(ok)
+
+    for sym, df in frames:
+        df, rejected = to_profile(df, profile)
+        res.rejected += rejected
+        if df.empty:
+            continue
+        pending.append((sym, df))
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    return res
+
+def stored_bar_profile(lib, timeframe: str, symbol: str) -> str | None:
+    """The bar profile `symbol` was written under (from its close dtype); None if it holds no bars."""
+    try:
+        head = lib.head(key_bars(timeframe, symbol), 1, columns=["close"]).data
+    except NoDataFoundException:
+        return None
+    if head.empty:
+        return None
+    return "compact" if head["close"].dtype == np.float32 else "float64"
+
+DateLike = pd.Timestamp | dt.datetime | dt.date | str
+
+def _bound(x: DateLike | None, *, end: bool = False) -> pd.Timestamp | None:
+    """
+    ArcticDB date_range bound (UTC). A bare date covers the whole day, so
+    end=date includes that day's bar (daily bars are stamped at the session
+    start in UTC, not at midnight).
+    """
+    if x is None:
+        return None
+    whole_day = isinstance(x, dt.date) and not isinstance(x, dt.datetime)
+    ts = pd.Timestamp(x)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    if end and (whole_day or (isinstance(x, str) and len(x) == 10)):
+        ts += pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    return ts
+
+def date_range_bounds(start: DateLike | None, end: DateLike | None):
+    """ArcticDB date_range for inclusive start/end (None when unbounded on both sides)."""
+    if start is None and end is None:
+        return None
+    return (_bound(start), _bound(end, end=True))
+
+@dataclass(frozen=True)
+class BarReader:
+    """
+    A bar read that has not happened yet: start/end/columns/tail are pushed
+    down to ArcticDB (date_range / columns / QueryBuilder.tail), so only the
+    requested rows and columns are decoded.
+
+        BarReader(lib, "1d", "SPY").select(["close"]).last(300).read()
+
+    Bars are stored in index order, so the result is already sorted; callers
+    get ArcticDB's frame directly, with no defensive copy.
+    """
+
+    lib: object
+    timeframe: str
+    symbol: str
+    start: DateLike | None = None
+    end: DateLike | None = None
+    columns: tuple[str, ...] | None = None
+    tail: int | None = None
+
+    def between(self, start: DateLike | None = None, end: DateLike | None = None) -> "BarReader":
+        return replace(self, start=start, end=end)
+
+    def select(self, columns: Iterable[str]) -> "BarReader":
+        return replace(self, columns=tuple(columns))
+
+    def last(self, n: int) -> "BarReader":
+        return replace(self, tail=n)
+
+    @property
+    def key(self) -> str:
+        return key_bars(self.timeframe, self.symbol)
+
+    def _date_range(self):
+        return date_range_bounds(self.start, self.end)
+
+    def lazy(self):
+        """ArcticDB LazyDataFrame for further pushed-down processing; .collect().data runs it."""
+        q = QueryBuilder()
+        if self._date_range() is not None:
+            q = q.date_range(self._date_range())
+        if self.tail is not None:
+            q = q.tail(self.tail)
+        cols = list(self.columns) if self.columns is not None else None
+        return self.lib.read(self.key, columns=cols, query_builder=q, lazy=True)
+
+    def _read(self, as_of: int | None = None) -> pd.DataFrame:
+        cols = list(self.columns) if self.columns is not None else None
+        date_range = self._date_range()
+        if self.tail is None:
+            df = self.lib.read(self.key, as_of=as_of, date_range=date_range, columns=cols).data
+        elif date_range is None:
+            df = self.lib.tail(self.key, self.tail, as_of=as_of, columns=cols).data
+        else:
+            q = QueryBuilder().date_range(date_range).tail(self.tail)
+            df = self.lib.read(self.key, as_of=as_of, columns=cols, query_builder=q).data
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")  # only for stores written before appends were ordered
+        return df
+
+    def read(self, cache: BarCache | bool = True, *, upcast: bool = False) -> pd.DataFrame:
+        """
+        Run the read. cache=True goes through the process-wide BarCache (if
+        enabled), False reads straight from storage, or pass a BarCache.
+        upcast=True returns compact-profile bars as float64.
+        """
+        if cache is True:
+            cache = default_bar_cache()
+        if not cache:
+            df = self._read()
+        else:
+            version = self.lib.read_metadata(self.key).version
+            params = (self._date_range(), self.columns, self.tail)
+            df = cache.get_or_load(self.lib, self.key, version, params, lambda: self._read(as_of=version))
+        return upcast_bars(df) if upcast else df
+
+def read_bars(
+    lib,
+    timeframe: str,
+    symbol: str,
+    *,
+    start: DateLike | None = None,
+    end: DateLike | None = None,
+    columns: Iterable[str] | None = None,
+    tail: int | None = None,
+    cache: BarCache | bool = True,
+    upcast: bool = False,
+) -> pd.DataFrame:
+    """
+    Bars for one symbol, sorted by timestamp. start/end are inclusive (a date
+    covers the whole day), columns restricts the decoded columns and tail
+    keeps only the last N bars of the range; all are applied by ArcticDB.
+    Repeated reads are served from the bar cache while the symbol's version
+    is unchanged (see BarReader.read). upcast=True returns compact-profile
+    bars with float64 prices and volume.
+    """
+    cols = tuple(columns) if columns is not None else None
+    return BarReader(lib, timeframe, symbol, start, end, cols, tail).read(cache, upcast=upcast)
+
+@dataclass
+class BarPanel:
+    """
+    Bars for many symbols aligned on the union of their timestamps: one
+    C-contiguous float64 array of shape (dates, symbols) per field, NaN where
+    a symbol has no bar. frame(field) wraps an array as a date x ticker
+    DataFrame without copying it.
+    """
+
+    index: pd.DatetimeIndex
+    symbols: list[str]
+    fields: dict[str, np.ndarray]
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, pd.DataFrame], columns: Iterable[str] | None = None) -> "BarPanel":
+        symbols = list(frames)
+        if columns is None:
+            columns = dict.fromkeys(c for df in frames.values() for c in df.columns)
+        columns = list(columns)
+        indexes = [df.index for df in frames.values()]
+        index = indexes[0].append(indexes[1:]).unique().sort_values() if indexes else pd.DatetimeIndex([], tz="UTC")
+        fields = {c: np.full((len(index), len(symbols)), np.nan) for c in columns}
+        for j, sym in enumerate(symbols):
+            df = frames[sym]
+            rows = index.get_indexer(df.index)
+            for c in columns:
+                if c in df.columns:
+                    fields[c][rows, j] = df[c].to_numpy(dtype="float64", na_value=np.nan)
+        return cls(index, symbols, fields)
+
+    def frame(self, field: str) -> pd.DataFrame:
+        return pd.DataFrame(self.fields[field], index=self.index, columns=self.symbols, copy=False)
+
+    __getitem__ = frame
+
+def read_bars_many(
+    lib,
+    timeframe: str,
+    symbols: Iterable[str],
+    *,
+    start: DateLike | None = None,
+    end: DateLike | None = None,
+    columns: Iterable[str] | None = None,
+    tail: int | None = None,
+    panel: bool = False,
+    upcast: bool = False,
+    batch_size: int = 500,
+    workers: int = 4,
+) -> dict[str, pd.DataFrame] | BarPanel:
+    """
+    read_bars for many symbols through read_batch, `batch_size` symbols per
+    call and up to `workers` calls in flight. Symbols with no stored bars are
+    left out; any other per-symbol error is raised. Returns {symbol: bars}
+    in input order (upcast as in read_bars), or with panel=True a BarPanel
+    of the same data.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    cols = list(columns) if columns is not None else None
+    date_range = date_range_bounds(start, end)
+    q = None
+    if tail is not None:
+        q = QueryBuilder()
+        if date_range is not None:
+            q = q.date_range(date_range)
+        q = q.tail(tail)
+        date_range = None
+
+    def read_chunk(chunk: list[str]) -> list[tuple[str, pd.DataFrame]]:
+        reqs = [ReadRequest(key_bars(timeframe, sym), date_range=date_range, columns=cols, query_builder=q) for sym in chunk]
+        out = []
+        for sym, item in zip(chunk, lib.read_batch(reqs)):
+            if isinstance(item, DataError):
+                if item.error_category == ErrorCategory.MISSING_DATA:
+                    continue
+                raise RuntimeError(f"read_bars_many {sym}: {item.exception_string}")
+            df = item.data
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind="stable")
+            out.append((sym, upcast_bars(df) if upcast else df))
+        return out
+
+    chunks = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+        frames = {sym: df for part in pool.map(read_chunk, chunks) for sym, df in part}
+    return BarPanel.from_frames(frames, cols) if panel else frames
@@ -0,0 +1,118 @@
+# marketlab/data/bar_cache.py
+"""
+In-process LRU cache for bar frames read from ArcticDB.
+
+Entries are keyed by (library, symbol, version, read parameters). The reader
+looks up the symbol's latest version first (a version-key read, no data) and
+reads at exactly that version, so a cached frame is never stale: once a
+symbol is written again, its older entries are dropped on the next lookup.
+Eviction is least-recently-used under a byte budget.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Hashable
+
+import pandas as pd
+
+from marketlab.config import MarketlabConfig
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0  # entries dropped because the symbol got a newer version
+    bytes: int = 0
+    entries: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+class BarCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._versions: dict[tuple[str, str], int] = {}  # (library, symbol) -> latest version seen
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def library_id(lib) -> str:
+        return repr(lib)  # includes the storage URI and library name
+
+    def get_or_load(
+        self, lib, symbol: str, version: int, params: Hashable, load: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        The frame cached for (lib, symbol, version, params), else load() it and
+        cache it. Callers get a shallow copy, so adding columns does not leak
+        into the cache (values must still be treated as read-only).
+        """
+        lib_id = self.library_id(lib)
+        key = (lib_id, symbol, version, params)
+        with self._lock:
+            self._invalidate_older(lib_id, symbol, version)
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return hit[0].copy(deep=False)
+            self._stats.misses += 1
+
+        df = load()
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if size <= self.max_bytes and self._versions.get((lib_id, symbol), version) <= version:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._stats.bytes -= old[1]
+                self._entries[key] = (df, size)
+                self._stats.bytes += size
+                self._evict()
+        return df.copy(deep=False)
+
+    def _invalidate_older(self, lib_id: str, symbol: str, version: int) -> None:
+        seen = self._versions.get((lib_id, symbol))
+        if seen is not None and seen >= version:
+            return
+        self._versions[(lib_id, symbol)] = version
+        if seen is None:
+            return
+        for key in [k for k in self._entries if k[0] == lib_id and k[1] == symbol and k[2] < version]:
+            self._stats.bytes -= self._entries.pop(key)[1]
+            self._stats.invalidations += 1
+
+    def _evict(self) -> None:
+        while self._stats.bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._stats.bytes -= size
+            self._stats.evictions += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**self._stats.as_dict(), "entries": len(self._entries)})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._stats.bytes = 0
+
+_default: BarCache | None = None
+_default_set = False
+
+def default_bar_cache() -> BarCache | None:
+    """The process-wide cache used by read_bars; sized by MARKETLAB_BAR_CACHE_BYTES (0 disables)."""
+    global _default, _default_set
+    if not _default_set:
+        max_bytes = MarketlabConfig().bar_cache_bytes
+        _default = BarCache(max_bytes) if max_bytes > 0 else None
+        _default_set = True
+    return _default
+
+def set_default_bar_cache(cache: BarCache | None) -> None:
+    global _default, _default_set
+    _default, _default_set = cache, True
@@ -0,0 +1,66 @@
+# marketlab/data/bar_profile.py
+"""
+Storage dtype profiles for bars.
+
+  float64  prices and volume as float64 (what the flatfiles decode to)
+  compact  prices as float32, volume as uint64, transactions as uint32
+
+The compact profile halves the bytes per price. A row is only stored
+compact if every value survives the cast: prices must round-trip within half
+a tick (half a cent at or above $1, half of $0.0001 below $1, i.e. the
+quoting increments), and counts must be non-negative integers that fit the
+target dtype. Other rows are rejected rather than silently rounded; a store
+holding prices float32 cannot represent them (e.g. BRK.A above ~$131k).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+PROFILES = ("float64", "compact")
+PRICE_COLUMNS = ("open", "high", "low", "close", "vwap")
+COUNT_DTYPES = {"volume": np.dtype("uint64"), "transactions": np.dtype("uint32")}
+
+def _price_tolerance(x: np.ndarray) -> np.ndarray:
+    return np.where(np.abs(x) >= 1.0, 0.005, 0.00005)
+
+def compact_bars(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Cast bars to the compact profile. Returns (frame of the rows that convert
+    without loss, number of rejected rows). Columns outside the profile pass
+    through unchanged.
+    """
+    ok = np.ones(len(df), dtype=bool)
+    cast: dict[str, np.ndarray] = {}
+    for c in PRICE_COLUMNS:
+        if c not in df.columns:
+            continue
+        x = df[c].to_numpy(dtype="float64", na_value=np.nan)
+        y = x.astype("float32")
+        ok &= np.isnan(x) | (np.abs(y.astype("float64") - x) <= _price_tolerance(x))
+        cast[c] = y
+    for c, dtype in COUNT_DTYPES.items():
+        if c not in df.columns:
+            continue
+        x = df[c].to_numpy(dtype="float64", na_value=np.nan)
+        good = np.isfinite(x) & (x >= 0) & (x == np.floor(x)) & (x <= float(np.iinfo(dtype).max))
+        ok &= good
+        cast[c] = np.where(good, x, 0).astype(dtype)
+    if not cast:
+        return df, 0
+    out = df.assign(**{c: v for c, v in cast.items()})
+    rejected = int(len(df) - ok.sum())
+    return (out if rejected == 0 else out.loc[ok]), rejected
+
+def upcast_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact-profile bars back to the float64 profile's dtypes (no-op on float64 bars)."""
+    cols = {c: "float64" for c in (*PRICE_COLUMNS, *COUNT_DTYPES) if c in df.columns and df[c].dtype != "float64"}
+    return df.astype(cols) if cols else df
+
+def to_profile(df: pd.DataFrame, profile: str) -> tuple[pd.DataFrame, int]:
+    """(bars as stored under `profile`, rejected rows)."""
+    if profile == "float64":
+        return df, 0
+    if profile == "compact":
+        return compact_bars(df)
+    raise ValueError(f"Unknown bar profile {profile!r} (expected one of {PROFILES})")
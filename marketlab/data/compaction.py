@@ -0,0 +1,112 @@
+# marketlab/data/compaction.py
+"""
+Row-slice compaction for append-fragmented symbols.
+
+Every daily append adds a one-row segment per symbol, so after a few years a
+full read of bars/1d/X touches thousands of data keys. compact_symbol()
+rewrites a symbol's segments into slices of ~rows_per_segment rows with
+ArcticDB's compact_data, which supersedes defragment_symbol_data and, unlike
+it, reports the before/after slice counts up front (compact_data_explain_plan).
+
+Pruning is deferred: the compacted version is written alongside the old
+ones, checked against the planned version (same row count and date range,
+nothing written in between) and only then are previous versions pruned. A
+symbol whose check fails keeps all its versions and is reported.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator
+
+@dataclass
+class CompactionPlan:
+    symbol: str
+    version: int
+    segments_before: int
+    segments_after: int
+
+    @property
+    def segments_saved(self) -> int:
+        return self.segments_before - self.segments_after
+
+@dataclass
+class CompactionResult:
+    symbol: str
+    segments_before: int
+    segments_after: int
+    version: int | None = None
+    pruned: bool = False
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+def plan_symbol(lib, symbol: str, rows_per_segment: int | None = None) -> CompactionPlan:
+    """Dry run: how many row slices the symbol has now and would have after compaction."""
+    info = lib.compact_data_explain_plan(symbol, rows_per_segment)
+    return CompactionPlan(symbol, info.version_id_before, info.num_row_slices_before, info.num_row_slices_after)
+
+def plan_compaction(
+    lib, symbols: Iterable[str], *, threshold: int, rows_per_segment: int | None = None, workers: int = 4
+) -> list[CompactionPlan]:
+    """Plans of the symbols compaction would shrink by at least `threshold` segments, most fragmented first."""
+
+    def one(symbol: str) -> CompactionPlan | None:
+        plan = plan_symbol(lib, symbol, rows_per_segment)
+        return plan if plan.segments_saved >= max(threshold, 1) else None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        plans = [p for p in pool.map(one, symbols) if p is not None]
+    return sorted(plans, key=lambda p: p.segments_saved, reverse=True)
+
+def time_reads(lib, symbols: Iterable[str], repeats: int = 3) -> dict[str, float]:
+    """Best-of-`repeats` seconds for a full read of each symbol (run it when nothing else is writing)."""
+    out = {}
+    for symbol in symbols:
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            lib.read(symbol)
+            best = min(best, time.perf_counter() - t0)
+        out[symbol] = best
+    return out
+
+def compact_symbol(
+    lib, plan: CompactionPlan, *, rows_per_segment: int | None = None, prune: bool = True
+) -> CompactionResult:
+    res = CompactionResult(plan.symbol, plan.segments_before, plan.segments_after)
+    try:
+        before = lib.get_description(plan.symbol, as_of=plan.version)
+        item = lib.compact_data(plan.symbol, rows_per_segment, prune_previous_versions=False)
+        res.version = item.version
+        after = lib.get_description(plan.symbol, as_of=item.version)
+        if item.version != plan.version + 1:
+            res.error = f"symbol was written during compaction (planned v{plan.version}, compacted v{item.version})"
+        elif (after.row_count, after.date_range) != (before.row_count, before.date_range):
+            res.error = f"compacted version differs: {after.row_count} rows vs {before.row_count}"
+        elif lib.read_metadata(plan.symbol).version != item.version:
+            res.error = "symbol was written after compaction"
+        elif prune:
+            lib.prune_previous_versions(plan.symbol)
+            res.pruned = True
+    except Exception as e:  # one symbol's failure must not stop the run
+        res.error = f"{type(e).__name__}: {e}"
+    return res
+
+def compact_symbols(
+    lib,
+    plans: list[CompactionPlan],
+    *,
+    rows_per_segment: int | None = None,
+    workers: int = 4,
+    prune: bool = True,
+) -> Iterator[CompactionResult]:
+    """Compact `plans` on `workers` threads, yielding results as they finish (in plan order)."""
+
+    def one(plan: CompactionPlan) -> CompactionResult:
+        return compact_symbol(lib, plan, rows_per_segment=rows_per_segment, prune=prune)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(one, plans)
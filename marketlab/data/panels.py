@@ -0,0 +1,90 @@
+# marketlab/data/panels.py
+"""
+Wide per-field bar panels: panels/{timeframe}/{field}, one row per session
+and one column per ticker, in a dynamic-schema library (tickers that list
+later simply add columns; absent tickers read back as NaN).
+
+Ingestion stages each decoded day with stage() and flush() writes the staged
+rows: appended when they are all newer than the panel (the normal daily
+case), otherwise merged into the stored rows they overlap. Cross-sections and
+date x ticker matrices are then single columnar reads instead of an unstack
+over the long table or one read per symbol.
+"""
+from __future__ import annotations
+
+import pandas as pd
+from arcticdb import LibraryOptions
+from arcticdb.exceptions import NoDataFoundException
+
+from marketlab.data.arctic import date_range_bounds
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+def key_panel(timeframe: str, field: str) -> str:
+    return f"panels/{timeframe}/{field}"
+
+def get_panel_lib(arctic, lib_name: str):
+    return arctic.get_library(lib_name, create_if_missing=True, library_options=LibraryOptions(dynamic_schema=True))
+
+class PanelStore:
+    def __init__(self, lib, timeframe: str = "1d", fields: tuple[str, ...] = PANEL_FIELDS, price_dtype: str = "float64"):
+        self.lib = lib
+        self.timeframe = timeframe
+        self.fields = fields
+        self.price_dtype = price_dtype  # float32 under the compact bar profile; volume stays float64 (NaN = no bar)
+        self._staged: list[pd.DataFrame] = []
+
+    def stage(self, df: pd.DataFrame) -> None:
+        """Queue a long frame (ticker, timestamp + fields; see read_day_file) for the next flush()."""
+        if not df.empty:
+            self._staged.append(df[["ticker", "timestamp", *self.fields]])
+
+    def _wide(self, df: pd.DataFrame, field: str) -> pd.DataFrame:
+        dtype = "float64" if field == "volume" else self.price_dtype
+        wide = df.pivot(index="timestamp", columns="ticker", values=field)
+        wide.columns = wide.columns.astype(str)
+        wide.columns.name = None
+        return wide.sort_index().astype(dtype)
+
+    def _last_ts(self, key: str) -> pd.Timestamp | None:
+        try:
+            tail = self.lib.tail(key, 1, columns=[]).data
+        except NoDataFoundException:
+            return None
+        return tail.index[-1] if len(tail) else None
+
+    def flush(self) -> int:
+        """Write staged rows into every field panel. Returns the number of sessions written."""
+        if not self._staged:
+            return 0
+        df = pd.concat(self._staged, ignore_index=True).drop_duplicates(["timestamp", "ticker"], keep="last")
+        self._staged = []
+        written = 0
+        for field in self.fields:
+            key = key_panel(self.timeframe, field)
+            wide = self._wide(df, field)
+            last = self._last_ts(key)
+            if last is None:
+                self.lib.write(key, wide, prune_previous_versions=True)
+            elif wide.index[0] > last:
+                self.lib.append(key, wide, prune_previous_versions=True)
+            else:
+                # backfill / re-ingest: staged rows win, other tickers and sessions are kept
+                stored = self.lib.read(key, date_range=(wide.index[0], wide.index[-1])).data
+                merged = wide.combine_first(stored).astype(wide.dtypes.iloc[0])
+                self.lib.update(key, merged, upsert=True, prune_previous_versions=True)
+            written = len(wide)
+        return written
+
+    def read(
+        self, field: str, start=None, end=None, tickers: list[str] | None = None
+    ) -> pd.DataFrame:
+        """date x ticker matrix of `field`; start/end and tickers are pushed down to ArcticDB."""
+        return self.lib.read(key_panel(self.timeframe, field), date_range=date_range_bounds(start, end), columns=tickers).data
+
+    def cross_section(self, field: str, day) -> pd.Series:
+        """`field` for every ticker on `day` (tickers without a bar that day dropped)."""
+        row = self.read(field, day, day)
+        if row.empty:
+            return pd.Series(dtype="float64", name=field)
+        return row.iloc[-1].dropna().rename(field)
@@ -0,0 +1,203 @@
+# marketlab/data/polygon_massive/cache_catalog.py
+"""
+SQLite catalog of the local flatfile cache, one row per day file:
+
+    day | path | size | mtime_ns | md5 | etag | downloaded_at | ingested_at | reingest
+
+The downloader records every file it lands and IngestSession.commit() stamps
+ingested_at for the days it committed (clearing reingest, which sync_range
+sets when it replaces an already-ingested day with a corrected file), so latest-date, existence and gap
+queries are index lookups instead of directory walks and stats. Files that
+reach the cache some other way (copied in, legacy updater) are picked up by
+rebuild(), which also runs once when the catalog is first created.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+from marketlab.calendar import missing_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import iter_cached_flatfiles
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    day TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    md5 TEXT,
+    etag TEXT,
+    downloaded_at TEXT,
+    ingested_at TEXT,
+    reingest INTEGER NOT NULL DEFAULT 0
+)
+"""
+_COLUMNS = ["day", "path", "size", "mtime_ns", "md5", "etag", "downloaded_at", "ingested_at", "reingest"]
+
+def file_md5(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.md5()
+    with Path(path).open("rb") as f:
+        while block := f.read(chunk):
+            h.update(block)
+    return h.hexdigest()
+
+def _now() -> str:
+    return dt.datetime.now().isoformat(timespec="seconds")
+
+def _day_of(path: Path) -> dt.date | None:
+    try:
+        return dt.date.fromisoformat(path.name[: -len(".csv.gz")])
+    except ValueError:
+        return None
+
+class FlatfileCatalog:
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # the pipeline's writer process and the parent may both hold it open
+        self.conn = sqlite3.connect(str(path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute(_SCHEMA)
+            have = {r[1] for r in self.conn.execute("PRAGMA table_info(files)")}
+            if "reingest" not in have:  # catalogs created before the column existed
+                self.conn.execute("ALTER TABLE files ADD COLUMN reingest INTEGER NOT NULL DEFAULT 0")
+
+    @classmethod
+    def for_config(cls, cfg: MarketlabConfig) -> "FlatfileCatalog":
+        root = cfg.massive_cache_dir / cfg.daily_symbol_set
+        path = root / "_catalog.sqlite"
+        created = not path.exists()
+        cat = cls(path, root)
+        if created:
+            cat.rebuild(checksums=False)  # bootstrap from whatever is already cached
+        return cat
+
+    def record_download(
+        self, day: dt.date, path: Path, *, etag: str | None = None, md5: str | None = None, reingest: bool = False
+    ) -> None:
+        """
+        Upsert a freshly landed file; clears ingested_at since the content may
+        have changed. reingest=True flags a replaced day whose old content is
+        already in the bars (see needs_reingest).
+        """
+        st = Path(path).stat()
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO files ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                (day.isoformat(), str(path), st.st_size, st.st_mtime_ns, md5, etag, _now(), int(reingest)),
+            )
+
+    def set_remote(self, day: dt.date, *, etag: str, md5: str | None = None) -> None:
+        """Record the remote ETag (and local md5) of a file verified to match it."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE files SET etag = ?, md5 = COALESCE(?, md5) WHERE day = ?", (etag, md5, day.isoformat())
+            )
+
+    def mark_ingested(self, days: Iterable[dt.date]) -> None:
+        now = _now()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET ingested_at = ?, reingest = 0 WHERE day = ?", [(now, d.isoformat()) for d in days]
+            )
+
+    def forget(self, day: dt.date) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE day = ?", (day.isoformat(),))
+
+    def drop_missing(self, days: Iterable[dt.date]) -> list[dt.date]:
+        """
+        Forget the days in `days` whose cached file has been deleted behind
+        the catalog's back; returns them, sorted. One stat per day, so pass
+        only the days about to be read.
+        """
+        missing = []
+        for day in sorted(set(days)):
+            row = self.conn.execute("SELECT path FROM files WHERE day = ?", (day.isoformat(),)).fetchone()
+            if row is not None and not Path(row[0]).exists():
+                missing.append(day)
+        if missing:
+            with self.conn:
+                self.conn.executemany("DELETE FROM files WHERE day = ?", [(d.isoformat(),) for d in missing])
+        return missing
+
+    def exists(self, day: dt.date) -> bool:
+        return self.conn.execute("SELECT 1 FROM files WHERE day = ?", (day.isoformat(),)).fetchone() is not None
+
+    def latest_date(self) -> dt.date | None:
+        (day,) = self.conn.execute("SELECT MAX(day) FROM files").fetchone()
+        return None if day is None else dt.date.fromisoformat(day)
+
+    def days(self, start: dt.date | None = None, end: dt.date | None = None) -> set[dt.date]:
+        """Cached days in [start, end] (either bound optional)."""
+        rows = self.conn.execute(
+            "SELECT day FROM files WHERE day >= ? AND day <= ?",
+            ((start or dt.date.min).isoformat(), (end or dt.date.max).isoformat()),
+        )
+        return {dt.date.fromisoformat(d) for (d,) in rows}
+
+    def not_ingested(self, start: dt.date | None = None, end: dt.date | None = None) -> list[dt.date]:
+        rows = self.conn.execute(
+            "SELECT day FROM files WHERE ingested_at IS NULL AND day >= ? AND day <= ? ORDER BY day",
+            ((start or dt.date.min).isoformat(), (end or dt.date.max).isoformat()),
+        )
+        return [dt.date.fromisoformat(d) for (d,) in rows]
+
+    def needs_reingest(self, start: dt.date | None = None, end: dt.date | None = None) -> list[dt.date]:
+        """Days re-downloaded with changed content after they had been ingested."""
+        rows = self.conn.execute(
+            "SELECT day FROM files WHERE reingest = 1 AND day >= ? AND day <= ? ORDER BY day",
+            ((start or dt.date.min).isoformat(), (end or dt.date.max).isoformat()),
+        )
+        return [dt.date.fromisoformat(d) for (d,) in rows]
+
+    def gaps(self, start: dt.date, end: dt.date) -> list[dt.date]:
+        """NYSE sessions in [start, end] with no cached file."""
+        return missing_sessions(start, end, self.days(start, end))
+
+    def get(self, day: dt.date) -> dict | None:
+        row = self.conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM files WHERE day = ?", (day.isoformat(),)).fetchone()
+        return None if row is None else dict(zip(_COLUMNS, row))
+
+    def rebuild(self, *, checksums: bool = True, ingested: Iterable[dt.date] | None = None) -> dict:
+        """
+        Re-derive the catalog from one walk of the cache directory. Rows whose
+        size and mtime are unchanged keep their md5, etag and timestamps;
+        changed files that had been ingested are flagged for re-ingest.
+        `ingested` (e.g. the manifest's days) stamps ingested_at where missing.
+        """
+        old = {r[0]: r for r in self.conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM files")}
+        ingested = {d.isoformat() for d in ingested or ()}
+        rows = []
+        for path in iter_cached_flatfiles(self.root):
+            day = _day_of(path)
+            if day is None:
+                continue
+            key = day.isoformat()
+            st = path.stat()
+            prev = old.get(key)
+            same = prev is not None and prev[2] == st.st_size and prev[3] == st.st_mtime_ns
+            if same:
+                md5, etag, downloaded_at, ingested_at, reingest = prev[4:9]
+            else:  # new, or replaced behind our back: if the old file was ingested, its bars are suspect
+                md5 = etag = downloaded_at = ingested_at = None
+                reingest = int(prev is not None and prev[7] is not None)
+            if checksums and md5 is None:
+                md5 = file_md5(path)
+            if ingested_at is None and key in ingested:
+                ingested_at = _now()
+            rows.append((key, str(path), st.st_size, st.st_mtime_ns, md5, etag, downloaded_at, ingested_at, reingest))
+        with self.conn:
+            self.conn.execute("DELETE FROM files")
+            self.conn.executemany(f"INSERT INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+        new = {r[0] for r in rows}
+        return {"files": len(rows), "added": len(new - old.keys()), "removed": len(old.keys() - new)}
+
+    def close(self) -> None:
+        self.conn.close()
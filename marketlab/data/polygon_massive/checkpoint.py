@@ -0,0 +1,60 @@
+# marketlab/data/polygon_massive/checkpoint.py
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+
+from marketlab.config import MarketlabConfig
+
+class CheckpointJournal:
+    """
+    Local append-only journal of committed ArcticDB batches.
+
+    Every successful write batch appends one line (label, e.g. the month, plus
+    each written symbol's watermark after the batch) and fsyncs it before the
+    next batch starts. The journal covers the window between session commits: on open the
+    entries are replayed into the watermarks, so a restarted run skips exactly
+    the (month, symbol) batches that had been written, and clear() drops them
+    once the watermarks and manifest are persisted.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def for_config(cls, cfg: MarketlabConfig) -> "CheckpointJournal":
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{cfg.daily_lib}__{cfg.daily_symbol_set}")
+        return cls(cfg.checkpoint_dir / f"{name}.jsonl")
+
+    def entries(self) -> list[dict]:
+        if not self.path.exists():
+            return []
+        out = []
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # torn last line from a crash mid-write
+        return out
+
+    def replay(self) -> dict[str, int]:
+        """symbol -> watermark (ns) after its last journaled batch since the last clear()."""
+        last: dict[str, int] = {}
+        for e in self.entries():
+            last.update(e["last_ts"])
+        return last
+
+    def record(self, label: str, last_ts: dict[str, int]) -> None:
+        if not last_ts:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps({"label": label, "last_ts": last_ts}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
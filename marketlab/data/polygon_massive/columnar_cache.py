@@ -0,0 +1,124 @@
+# marketlab/data/polygon_massive/columnar_cache.py
+"""
+Typed Arrow IPC sidecars for downloaded flatfiles.
+
+    .../2024/01/2024-01-02.csv.gz  ->  .../2024/01/2024-01-02.arrow
+
+The sidecar holds the CSV's columns exactly as parsed (see read_csv_raw) and
+records the source file's size and mtime in its schema metadata; a sidecar
+whose key no longer matches the source is ignored and rebuilt. Sidecars are
+read through a memory map, so a re-ingest skips gzip and CSV parsing.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: without pyarrow every read parses the CSV
+    pa = None
+
+_SOURCE_SIZE = b"marketlab.source_size"
+_SOURCE_MTIME = b"marketlab.source_mtime_ns"
+
+def sidecar_path(path: Path) -> Path:
+    name = path.name
+    stem = name[: -len(".csv.gz")] if name.endswith(".csv.gz") else path.stem
+    return path.with_name(f"{stem}.arrow")
+
+def read_csv_raw(source) -> pd.DataFrame:
+    """Parse a day_aggs_v1 .csv.gz (path or binary file object) with no normalization."""
+    # keep_default_na=False so real tickers like "NA" / "NULL" survive; blanks still become NaN
+    return pd.read_csv(source, compression="gzip", keep_default_na=False, na_values=[""])
+
+def _source_key(path: Path) -> dict[bytes, bytes]:
+    st = path.stat()
+    return {_SOURCE_SIZE: str(st.st_size).encode(), _SOURCE_MTIME: str(st.st_mtime_ns).encode()}
+
+def _open_sidecar_table(path: Path):
+    side = sidecar_path(path)
+    if pa is None or not side.exists():
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(str(side), "r"))
+        meta = reader.schema.metadata or {}
+        if any(meta.get(k) != v for k, v in _source_key(path).items()):
+            return None  # stale: source was re-downloaded or modified
+        return reader.read_all()
+    except (pa.ArrowInvalid, OSError):
+        return None  # truncated / foreign file: rebuild
+
+def _read_sidecar(path: Path) -> pd.DataFrame | None:
+    # the table's buffers point into the memory map, which stays open while referenced
+    table = _open_sidecar_table(path)
+    return None if table is None else table.to_pandas()
+
+def write_sidecar(path: Path, df: pd.DataFrame) -> Path | None:
+    """Write (atomically) the sidecar for `path` from its parsed frame."""
+    if pa is None:
+        return None
+    side = sidecar_path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **_source_key(path)})
+    tmp = side.with_suffix(side.suffix + ".partial")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(side)
+    return side
+
+def iter_flatfile_chunks(path: Path, chunk_rows: int, *, use_sidecar: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Raw columns of a cached flatfile in frames of at most `chunk_rows` rows.
+    A current sidecar is sliced zero-copy out of the memory map; otherwise the
+    CSV is parsed incrementally (no sidecar is written on this path).
+    """
+    path = Path(path)
+    table = _open_sidecar_table(path) if use_sidecar else None
+    if table is not None:
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            yield batch.to_pandas()
+        return
+    with pd.read_csv(
+        path, compression="gzip", keep_default_na=False, na_values=[""], chunksize=chunk_rows
+    ) as reader:
+        yield from reader
+
+def read_flatfile(path: Path, *, use_sidecar: bool = True) -> pd.DataFrame:
+    """
+    Raw columns of a cached flatfile, through its sidecar when one is current.
+    On a miss the CSV is parsed and, with use_sidecar, the sidecar is written.
+    """
+    path = Path(path)
+    if use_sidecar:
+        df = _read_sidecar(path)
+        if df is not None:
+            return df
+    df = read_csv_raw(path)
+    if use_sidecar:
+        try:
+            write_sidecar(path, df)
+        except OSError:
+            pass  # read-only cache: still return the parsed frame
+    return df
+
+def convert_flatfile(path: Path, force: bool = False) -> bool:
+    """Ensure a current sidecar exists for `path`. Returns True if one was written."""
+    path = Path(path)
+    if not force and _read_sidecar(path) is not None:
+        return False
+    return write_sidecar(path, read_csv_raw(path)) is not None
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for flatfile sidecars (pip install marketlab[arrow])")
+
+def iter_cached_flatfiles(root: Path):
+    """Every YYYY/MM/*.csv.gz under `root`, in date order."""
+    for dirpath, _, files in sorted(os.walk(root)):
+        for f in sorted(files):
+            if f.endswith(".csv.gz"):
+                yield Path(dirpath) / f
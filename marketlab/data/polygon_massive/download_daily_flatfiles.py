@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import datetime as dt
 import os
-import re
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
 import shutil
 
@@ -13,10 +16,11 @@ import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from marketlab.calendar import iter_sessions
 from marketlab.config import MarketlabConfig
-
-
-_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})\.csv\.gz$")
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog, file_md5
+from marketlab.data.polygon_massive.remote_index import RemoteIndex
+from marketlab.data.polygon_massive.retry import with_backoff
 
 
 def local_path_for_date(cfg: MarketlabConfig, day: dt.date) -> Path:
@@ -36,48 +40,28 @@ def s3_key_for_date(cfg: MarketlabConfig, day: dt.date) -> str:
 
 def find_latest_local_date(cfg: MarketlabConfig) -> dt.date | None:
     """
-    Finds the max date present under:
+    Max date present under:
       {massive_cache_dir}/{daily_symbol_set}/YYYY/MM/YYYY-MM-DD.csv.gz
-    Efficient enough for daily use.
+    answered from the cache catalog (no directory walk).
     """
-    root = cfg.massive_cache_dir / cfg.daily_symbol_set
-    if not root.exists():
-        return None
-
-    latest: dt.date | None = None
-
-    # Walk year/month directories; this avoids scanning the whole tree if it’s big.
-    # If you have a TON of data, you can limit to last 2 years, but usually fine.
-    for year_dir in sorted([p for p in root.iterdir() if p.is_dir() and p.name.isdigit()]):
-        for month_dir in sorted([p for p in year_dir.iterdir() if p.is_dir() and p.name.isdigit()]):
-            for f in month_dir.glob("*.csv.gz"):
-                m = _DATE_RE.search(f.name)
-                if not m:
-                    continue
-                y, mo, d = map(int, m.groups())
-                try:
-                    day = dt.date(y, mo, d)
-                except ValueError:
-                    continue
-                if latest is None or day > latest:
-                    latest = day
-
-    return latest
+    return FlatfileCatalog.for_config(cfg).latest_date()
 
 
 def iter_dates(start: dt.date, end: dt.date) -> Iterable[dt.date]:
-    d = start
-    while d <= end:
-        yield d
-        d += dt.timedelta(days=1)
+    """NYSE sessions in [start, end]; no file is published for other days."""
+    return iter_sessions(start, end)
 
 
-def make_s3_client(cfg: MarketlabConfig):
+def make_s3_client(cfg: MarketlabConfig, *, max_pool_connections: int | None = None):
     access_key, secret_key = cfg.require_massive_s3_creds()
     # Most S3-compatible providers need signature_v4 and path-style may matter.
     botocfg = Config(
         signature_version="s3v4",
         s3={"addressing_style": "path"},
+        # one pooled connection per download thread (botocore's default is 10)
+        max_pool_connections=max_pool_connections or max(cfg.download_workers, 10),
+        # throttling is retried by download_with_backoff, not inside botocore
+        retries={"max_attempts": 1, "mode": "standard"},
     )
     s3 = boto3.client(
         "s3",
@@ -96,6 +80,8 @@ class DownloadResult:
     skipped_existing: int
     missing_remote: int
     downloaded_days: list[dt.date]
+    failed: dict[dt.date, str] = field(default_factory=dict)  # day -> error after all retries
+    months_listed: int = 0  # LISTs issued to refresh the remote index
 
 MISSING_CODES = {"NoSuchKey", "404", "NotFound", "403", "AccessDenied"}
 
@@ -103,15 +89,34 @@ def object_exists_via_list(s3, bucket: str, key: str) -> bool:
     resp = s3.list_objects_v2(Bucket=bucket, Prefix=key, MaxKeys=1)
     return any(obj["Key"] == key for obj in resp.get("Contents", []))
 
-def try_download_day(s3, bucket: str, key: str, local_path: Path) -> bool:
+class RateLimiter:
+    """Token bucket shared by download threads: at most `rate` bytes/s, bursts up to one second's worth."""
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate) - n
+            self._last = now
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)  # the debt stays booked, so concurrent callers queue behind it
+
+def _copy_limited(src, dst, limiter: RateLimiter, chunk: int = 64 << 10) -> None:
+    while block := src.read(chunk):
+        limiter.consume(len(block))
+        dst.write(block)
+
+def fetch_object(s3, bucket: str, key: str, local_path: Path, *, limiter: RateLimiter | None = None) -> bool:
     """
-    Returns True if downloaded, False if not available / not allowed / not published yet.
-    Avoids download_file() because it does HeadObject.
+    GET `key` into `local_path` via a .partial rename. Returns False if the
+    object is not available / not allowed / not published yet.
     """
-    # First check existence cheaply (LIST works for you)
-    if not object_exists_via_list(s3, bucket, key):
-        return False
-
     local_path.parent.mkdir(parents=True, exist_ok=True)
     tmp = local_path.with_suffix(local_path.suffix + ".partial")
 
@@ -119,16 +124,116 @@ def try_download_day(s3, bucket: str, key: str, local_path: Path) -> bool:
         resp = s3.get_object(Bucket=bucket, Key=key)
         body = resp["Body"]  # StreamingBody
         with tmp.open("wb") as f:
-            shutil.copyfileobj(body, f)
+            if limiter is None:
+                shutil.copyfileobj(body, f)
+            else:
+                _copy_limited(body, f, limiter)
         tmp.replace(local_path)
         return True
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code")
         if code in MISSING_CODES:
-            if tmp.exists():
-                tmp.unlink(missing_ok=True)
             return False
         raise
+    finally:
+        tmp.unlink(missing_ok=True)  # interrupted copy: never leave a partial behind
+
+def try_download_day(s3, bucket: str, key: str, local_path: Path, *, limiter: RateLimiter | None = None) -> bool:
+    """
+    Returns True if downloaded, False if not available / not allowed / not published yet.
+    Avoids download_file() because it does HeadObject.
+    """
+    # First check existence cheaply (LIST works for you)
+    if not object_exists_via_list(s3, bucket, key):
+        return False
+    return fetch_object(s3, bucket, key, local_path, limiter=limiter)
+
+def download_with_backoff(
+    s3, bucket: str, key: str, local_path: Path, *,
+    max_retries: int, probe: bool = True, limiter: RateLimiter | None = None,
+) -> bool:
+    """try_download_day (or fetch_object when the key is already known to exist, probe=False) under with_backoff."""
+    download = try_download_day if probe else fetch_object
+    return with_backoff(lambda: download(s3, bucket, key, local_path, limiter=limiter), max_retries=max_retries)
+
+@dataclass
+class DownloadProgress:
+    total: int
+    done: int = 0
+    downloaded: int = 0
+    missing: int = 0
+    failed: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.bytes / elapsed / (1 << 20) if elapsed > 0 else 0.0
+        return (
+            f"[{self.done}/{self.total}] downloaded={self.downloaded} missing={self.missing} "
+            f"failed={self.failed} {self.bytes / (1 << 20):.1f} MiB {rate:.1f} MiB/s"
+        )
+
+def print_progress(p: DownloadProgress) -> None:
+    end = "\n" if p.done == p.total else ""
+    print("\r" + p.line(), end=end, file=sys.stderr, flush=True)
+
+def fetch_days(
+    cfg: MarketlabConfig,
+    s3,
+    bucket: str,
+    todo: list[tuple[dt.date, str, Path]],
+    *,
+    index: RemoteIndex | None,
+    catalog: FlatfileCatalog,
+    workers: int,
+    progress: Callable[[DownloadProgress], None] | None = None,
+    reingest: set[dt.date] = frozenset(),
+    limiter: RateLimiter | None = None,
+) -> tuple[list[dt.date], dict[dt.date, str], int]:
+    """
+    Fetch (day, key, path) items on a thread pool and record each landed file
+    in the catalog (days in `reingest` are flagged for re-ingest). Keys are
+    probed first unless an index vouches for them; `limiter` caps the pool's
+    combined bandwidth. Returns (downloaded days, failures, days missing remotely).
+    """
+    downloaded: list[dt.date] = []
+    failed: dict[dt.date, str] = {}
+    missing = 0
+    state = DownloadProgress(total=len(todo))
+
+    def job(key: str, path: Path) -> str | None:
+        ok = download_with_backoff(
+            s3, bucket, key, path, max_retries=cfg.download_max_retries, probe=index is None, limiter=limiter
+        )
+        return file_md5(path) if ok else None  # hashed in the worker, off the catalog thread
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as ex:
+        futs = {ex.submit(job, key, path): (day, key, path) for day, key, path in todo}
+        for fut in as_completed(futs):
+            day, key, path = futs[fut]
+            try:
+                md5 = fut.result()
+            except Exception as e:
+                failed[day] = f"{type(e).__name__}: {e}"
+                state.failed += 1
+            else:
+                if md5 is not None:
+                    remote = index.get(key) if index is not None else None
+                    catalog.record_download(
+                        day, path, etag=remote and remote["etag"], md5=md5, reingest=day in reingest
+                    )
+                    downloaded.append(day)
+                    state.downloaded += 1
+                    state.bytes += path.stat().st_size
+                else:
+                    missing += 1
+                    state.missing += 1
+            state.done += 1
+            if progress is not None:
+                progress(state)
+
+    return sorted(downloaded), dict(sorted(failed.items())), missing
 
 def download_missing_range(
     cfg: MarketlabConfig,
@@ -137,35 +242,153 @@ def download_missing_range(
     start: dt.date,
     end: dt.date,
     overwrite: bool = False,
+    workers: int | None = None,
+    s3=None,
+    progress: Callable[[DownloadProgress], None] | None = None,
+    use_index: bool = True,
+    refresh_index: bool = False,
 ) -> DownloadResult:
-    s3 = make_s3_client(cfg)
+    """
+    Download every day in [start, end] missing from the local cache, `workers`
+    days at a time on one pooled client (pass `s3` to use another client,
+    e.g. one pointed at a local S3 stand-in). Files land via .partial renames.
+
+    With use_index the remote side comes from RemoteIndex (one paginated LIST
+    per year/month, cached between runs) and only keys present there are
+    fetched; without it every missing day is probed with its own LIST.
+    """
+    workers = workers or cfg.download_workers
+    if s3 is None:
+        s3 = make_s3_client(cfg, max_pool_connections=workers)
 
-    checked = downloaded = skipped_existing = missing_remote = 0
-    downloaded_days: list[dt.date] = []
+    catalog = FlatfileCatalog.for_config(cfg)
+    cached = set() if overwrite else catalog.days(start, end)
 
+    checked = skipped_existing = missing_remote = months_listed = 0
+    todo: list[tuple[dt.date, str, Path]] = []
     for day in iter_dates(start, end):
         checked += 1
-
-        local_path = local_path_for_date(cfg, day)
-        if local_path.exists() and not overwrite:
+        if day in cached:
             skipped_existing += 1
             continue
-
-        key = s3_key_for_date(cfg, day)
-        ok = try_download_day(s3, bucket, key, local_path)
-
-        if ok:
-            downloaded += 1
-            downloaded_days.append(day)
-        else:
-            missing_remote += 1
+        todo.append((day, s3_key_for_date(cfg, day), local_path_for_date(cfg, day)))
+
+    index = None
+    if use_index and todo:
+        index = RemoteIndex.for_config(cfg)
+        months = sorted({(day.year, day.month) for day, _, _ in todo})
+        months_listed = index.ensure(s3, bucket, cfg, months, refresh=refresh_index)
+        index.save()
+        available = [t for t in todo if index.get(t[1]) is not None]
+        missing_remote = len(todo) - len(available)
+        todo = available
+
+    downloaded_days, failed, gone = fetch_days(
+        cfg, s3, bucket, todo, index=index, catalog=catalog, workers=workers, progress=progress
+    )
+    missing_remote += gone
 
     return DownloadResult(
         checked=checked,
-        downloaded=downloaded,
+        downloaded=len(downloaded_days),
         skipped_existing=skipped_existing,
         missing_remote=missing_remote,
-        downloaded_days=downloaded_days
+        downloaded_days=downloaded_days,
+        failed=failed,
+        months_listed=months_listed,
+    )
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    checked: int
+    unchanged: int
+    new_days: list[dt.date]
+    changed_days: list[dt.date]  # re-fetched because the remote ETag/size differs from the local record
+    reingest_days: list[dt.date]  # changed days whose old content had been ingested
+    missing_remote: int
+    failed: dict[dt.date, str] = field(default_factory=dict)
+    months_listed: int = 0
+
+def matches_remote(local: dict, remote: dict) -> bool:
+    """
+    Whether a catalog row still matches the remote object. Size first; then
+    the recorded ETag, or for files cached before ETags were recorded, the
+    local md5 against a single-part ETag (which is the object's md5).
+    """
+    if local["size"] != remote["size"]:
+        return False
+    if local["etag"]:
+        return local["etag"] == remote["etag"]
+    if "-" not in remote["etag"]:
+        return (local["md5"] or file_md5(Path(local["path"]))) == remote["etag"]
+    return True  # multipart ETag without a recorded one: size is all we can compare
+
+def sync_range(
+    cfg: MarketlabConfig,
+    *,
+    bucket: str,
+    start: dt.date,
+    end: dt.date,
+    workers: int | None = None,
+    s3=None,
+    progress: Callable[[DownloadProgress], None] | None = None,
+) -> SyncResult:
+    """
+    Incremental sync of [start, end]: re-list the months (so republished days
+    are seen even in final months), fetch days missing locally, and re-fetch
+    only days whose remote ETag/size no longer matches the catalog. Replaced
+    days that had been ingested are flagged in the catalog for re-ingest
+    (see reingest_day); unchanged files get their ETag recorded.
+    """
+    workers = workers or cfg.download_workers
+    if s3 is None:
+        s3 = make_s3_client(cfg, max_pool_connections=workers)
+    catalog = FlatfileCatalog.for_config(cfg)
+    index = RemoteIndex.for_config(cfg)
+
+    days = list(iter_dates(start, end))
+    months_listed = index.ensure(s3, bucket, cfg, sorted({(d.year, d.month) for d in days}), refresh=True)
+    index.save()
+
+    todo: list[tuple[dt.date, str, Path]] = []
+    new_days: list[dt.date] = []
+    changed: list[dt.date] = []
+    reingest: set[dt.date] = set()
+    unchanged = missing_remote = 0
+    for day in days:
+        key = s3_key_for_date(cfg, day)
+        remote = index.get(key)
+        if remote is None:
+            missing_remote += 1
+            continue
+        local = catalog.get(day)
+        if local is None:
+            new_days.append(day)
+        elif matches_remote(local, remote):
+            unchanged += 1
+            if local["etag"] != remote["etag"]:
+                catalog.set_remote(day, etag=remote["etag"])
+            continue
+        else:
+            changed.append(day)
+            if local["ingested_at"] or local["reingest"]:
+                reingest.add(day)
+        todo.append((day, key, local_path_for_date(cfg, day)))
+
+    fetched, failed, gone = fetch_days(
+        cfg, s3, bucket, todo, index=index, catalog=catalog, workers=workers, progress=progress, reingest=reingest
+    )
+    fetched_set = set(fetched)
+    return SyncResult(
+        checked=len(days),
+        unchanged=unchanged,
+        new_days=[d for d in new_days if d in fetched_set],
+        changed_days=[d for d in changed if d in fetched_set],
+        reingest_days=sorted(d for d in reingest if d in fetched_set),
+        missing_remote=missing_remote + gone,
+        failed=failed,
+        months_listed=months_listed,
     )
 
 
@@ -174,6 +397,8 @@ def update_to_latest_available(
     *,
     lookback_days: int = 10,
     overwrite: bool = False,
+    workers: int | None = None,
+    progress: Callable[[DownloadProgress], None] | None = None,
 ) -> DownloadResult:
     """
     Daily “update” behavior:
@@ -193,4 +418,6 @@ def update_to_latest_available(
 
     end = today
 
-    return download_missing_range(cfg, bucket=cfg.massive_bucket, start=start, end=end, overwrite=overwrite)
+    return download_missing_range(
+        cfg, bucket=cfg.massive_bucket, start=start, end=end, overwrite=overwrite, workers=workers, progress=progress
+    )
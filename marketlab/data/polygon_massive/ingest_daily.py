@@ -1,29 +1,21 @@
 # marketlab/data/polygon_massive/ingest_daily.py
 from __future__ import annotations
 
-import subprocess
-import sys
-import os
-from pathlib import Path
 from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic, get_lib
+from marketlab.data.polygon_massive.download_daily_flatfiles import make_s3_client
+from marketlab.legacy import update_massive_flatfiles as legacy
 
-def run_legacy_daily_ingest(cfg: MarketlabConfig) -> None:
+def run_legacy_daily_ingest(cfg: MarketlabConfig, *, lib=None, s3=None, ken_french: bool = True) -> dict:
     """
-    Calls the legacy script as a subprocess to avoid import-time env crashes.
-    Later we can refactor legacy into importable functions.
+    Run the legacy daily updater (us_stocks_day_aggs_v1 panel + Ken French
+    factors) in this process. The legacy module reads its settings from `cfg`
+    at call time; `lib` and `s3` let a nightly job share one Arctic handle and
+    one pooled S3 client across its steps.
     """
-    legacy_path = Path(__file__).resolve().parents[2] / "legacy" / "update_massive_flatfiles.py"
-    if not legacy_path.exists():
-        raise FileNotFoundError(f"Legacy ingest script not found at: {legacy_path}")
-
-    env = dict(**os.environ)
-    # Ensure required env vars are present
-    api_key = cfg.require_massive_api_key()
-    ak, sk = cfg.require_massive_s3_creds()
-    env["MASSIVE_S3_ACCESS_KEY"] = ak
-    env["MASSIVE_S3_SECRET_KEY"] = sk
-    env["MASSIVE_API_KEY"] = api_key
-    env["MARKETLAB_ARCTIC_URI"] = cfg.arctic_uri
-    env["MARKETLAB_ARCTIC_LIB_DAILY"] = cfg.daily_lib
-
-    subprocess.check_call([sys.executable, str(legacy_path)], env=env)
+    cfg.require_massive_s3_creds()
+    if lib is None:
+        lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
+    if s3 is None:
+        s3 = make_s3_client(cfg)
+    return legacy.update_all_days(cfg, lib=lib, s3=s3, ken_french=ken_french)
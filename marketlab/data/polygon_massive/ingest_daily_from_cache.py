@@ -2,12 +2,22 @@ from __future__ import annotations
 
 import datetime as dt
 from pathlib import Path
-import pandas as pd
+from typing import Iterator
 
-from arcticdb.exceptions import NoDataFoundException
+import numpy as np
+import pandas as pd
 
 from marketlab.config import MarketlabConfig
-from marketlab.data.arctic import get_arctic, get_lib, key_bars
+from marketlab.data.arctic import BatchWriteResult, write_bars_batch
+from marketlab.data.polygon_massive.columnar_cache import read_flatfile
+# manifest helpers re-exported for existing callers
+from marketlab.data.polygon_massive.manifest import is_day_ingested, mark_day_ingested, manifest_key
+from marketlab.data.polygon_massive.session import IngestSession
+
+# Expected schema (day_aggs_v1 header):
+# ticker,volume,open,close,high,low,window_start,transactions
+REQUIRED_COLUMNS = {"ticker", "volume", "open", "close", "high", "low", "window_start"}
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
 
 def flatfile_path(cfg: MarketlabConfig, day: dt.date) -> Path:
     return (
@@ -18,77 +28,176 @@ def flatfile_path(cfg: MarketlabConfig, day: dt.date) -> Path:
         / f"{day:%Y-%m-%d}.csv.gz"
     )
 
-def ingest_day(cfg: MarketlabConfig, day: dt.date, *, append: bool = True) -> dict:
-    path = flatfile_path(cfg, day)
-    if not path.exists():
-        raise FileNotFoundError(path)
-
-    df = pd.read_csv(path, compression="gzip")
-
-    required = {"ticker", "volume", "open", "close", "high", "low", "window_start"}
-    missing = required - set(df.columns)
+def read_day_file(path: Path, *, use_sidecar: bool = True) -> pd.DataFrame:
+    """
+    Decode one day file into a columnar frame with columns
+    ticker, timestamp + BAR_COLUMNS (RangeIndex, file order).
+    Reads through the .arrow sidecar cache when use_sidecar is set.
+    """
+    df = read_flatfile(path, use_sidecar=use_sidecar)
+    return normalize_day_frame(df, path)
+
+def normalize_day_frame(df: pd.DataFrame, source="<stream>") -> pd.DataFrame:
+    missing = REQUIRED_COLUMNS - set(df.columns)
     if missing:
-        raise ValueError(f"Missing columns {sorted(missing)} in {path}")
+        raise ValueError(f"Missing columns {sorted(missing)} in {source}")
 
     # window_start is epoch in *nanoseconds*
-    ts = pd.to_datetime(df["window_start"], unit="ns", utc=True).dt.tz_convert("UTC")
-    df = df.assign(timestamp=ts).set_index("timestamp")
+    ts = pd.to_datetime(df["window_start"], unit="ns", utc=True)
+    out = df[BAR_COLUMNS].assign(ticker=df["ticker"].astype("object"), timestamp=ts)
+    return out[out["ticker"].notna()][["ticker", "timestamp", *BAR_COLUMNS]]
+
+def iter_symbol_slices(df: pd.DataFrame) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    Sort once by (ticker, timestamp) and yield (symbol, bars) slices cut at the
+    ticker boundaries. bars is indexed by timestamp with BAR_COLUMNS.
+    """
+    if df.empty:
+        return
+    df = df.sort_values(["ticker", "timestamp"], kind="stable")
+    tickers = df["ticker"].to_numpy()
+    bars = df.set_index("timestamp")[BAR_COLUMNS]
+
+    starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+    ends = np.r_[starts[1:], len(tickers)]
+    for lo, hi in zip(starts, ends):
+        yield tickers[lo], bars.iloc[lo:hi]
+
+def write_slices(
+    session: IngestSession, slices, *, append: bool = True, update: bool = False, label: str = ""
+) -> BatchWriteResult:
+    """
+    Batch-write (symbol, bars) slices. In append mode rows at or before each
+    symbol's watermark are dropped (counted in `skipped`) without reading bars;
+    with update=True each slice replaces its own date range in the symbol
+    (history behind the watermark can be filled in); otherwise each symbol is
+    rewritten. After every storage batch the written symbols' watermarks move
+    and the batch is journaled under `label`.
+    """
+    wm = session.watermarks
+    skipped = 0
+
+    def fresh():
+        nonlocal skipped
+        for sym, out in slices:
+            if append and not update:
+                kept = wm.filter(sym, out)
+                skipped += len(out) - len(kept)
+                out = kept
+            yield sym, out
+
+    mode = "update" if update else "append" if append else "rewrite"
+
+    def committed(batch) -> None:
+        for sym, out in batch:
+            if append or update:
+                wm.advance(sym, out)
+            else:
+                wm.reset(sym, out)
+            if session.symbols is not None:
+                session.symbols.observe(sym, out, mode)
+        # journal the resulting watermarks, not the batch's last bar: an update batch filling
+        # history ends before the watermark, and replaying its last bar would move it backwards
+        session.journal.record(label, {sym: wm.last_ns(sym) for sym, _ in batch if wm.last_ns(sym) is not None})
+
+    res = write_bars_batch(
+        session.lib,
+        "1d",
+        fresh(),
+        upsert=not append,
+        update=update,
+        profile=session.cfg.bar_profile,
+        batch_size=session.cfg.ingest_batch_size,
+        on_batch=committed,
+    )
+    res.skipped = skipped
+    return res
+
+def write_day_frame(session: IngestSession, day: dt.date, df: pd.DataFrame, *, append: bool = True) -> BatchWriteResult:
+    """
+    Write one decoded day (see read_day_file) to bars/1d/{symbol} in batches of
+    cfg.ingest_batch_size. Per-symbol failures are collected in the result.
+    In append mode the day is marked in the session manifest unless a symbol
+    failed (a rerun retries it; the watermarks skip the rows already written);
+    committing is up to the caller.
+    """
+    res = write_slices(session, iter_symbol_slices(df), append=append, label=str(day))
+
+    if not res.failures:
+        session.stage_panels(df)
+        if append:
+            session.manifest.mark(day, rows=len(df), symbols=df["ticker"].nunique())
+
+    return res
+
+def ingest_day(
+    cfg: MarketlabConfig,
+    day: dt.date,
+    *,
+    append: bool = True,
+    session: IngestSession | None = None,
+) -> dict:
+    """
+    Ingest one cached day file. Pass a shared `session` (and commit it) when
+    ingesting many days; without one it is opened and committed here.
+    """
+    path = flatfile_path(cfg, day)
+    if not path.exists():
+        raise FileNotFoundError(path)
 
-    arctic = get_arctic(cfg.arctic_uri)
-    lib = get_lib(arctic, cfg.daily_lib)
+    own_session = session is None
+    if own_session:
+        session = IngestSession.open(cfg)
 
-    if append and is_day_ingested(lib, cfg, day):
+    if append and day in session.manifest:
         return {"date": str(day), "file": str(path), "symbols": 0, "rows_total": 0, "skipped": True}
 
-    rows_total = 0
-    symbols = 0
-
-    # group by ticker and append to bars/1d/{symbol}
-
-    for sym, g in df.groupby("ticker", sort=False):
-        out = g[["open", "high", "low", "close", "volume"]].sort_index()
-        k = key_bars("1d", sym)
-
-        if append:
-            try:
-                existing = lib.read(k).data
-                # drop already-present timestamps
-                out = out.loc[~out.index.isin(existing.index)]
-            except NoDataFoundException:
-                pass  # symbol not present yet
-
-            if len(out):
-                lib.append(k, out)
-        else:
-            lib.write(k, out, prune_previous_versions=True)
-
-            rows_total += len(out)
-            symbols += 1
-    
-    if append:
-        mark_day_ingested(lib, cfg, day)
-
-    return {"date": str(day), "file": str(path), "symbols": symbols, "rows_total": rows_total}
-
-def manifest_key(cfg: MarketlabConfig) -> str:
-    return f"meta/ingested/{cfg.daily_symbol_set}"
-
-def is_day_ingested(lib, cfg: MarketlabConfig, day: dt.date) -> bool:
-    k = manifest_key(cfg)
-    try:
-        m = lib.read(k).data  # DataFrame with index=timestamp or column 'date'
-    except NoDataFoundException:
-        return False
-    # store as UTC timestamps at 00:00 to compare consistently
-    ts = pd.Timestamp(day, tz="UTC")
-    return ts in m.index
-
-def mark_day_ingested(lib, cfg: MarketlabConfig, day: dt.date) -> None:
-    k = manifest_key(cfg)
-    ts = pd.Timestamp(day, tz="UTC")
-    row = pd.DataFrame(index=pd.DatetimeIndex([ts]), data={"ingested": [True]})
-    try:
-        lib.append(k, row)
-    except NoDataFoundException:
-        lib.write(k, row)
-
+    df = read_day_file(path, use_sidecar=cfg.flatfile_sidecars)
+    res = write_day_frame(session, day, df, append=append)
+
+    if own_session:
+        session.commit()
+
+    return day_info(day, path, res)
+
+def reingest_day(session: IngestSession, day: dt.date) -> BatchWriteResult:
+    """
+    Replace `day` in every symbol listed in its (re-downloaded) file, whatever
+    the watermarks say: one update_batch payload per symbol, so history on
+    either side of the day is untouched. Symbols dropped from the corrected
+    file keep their old row (see repair_daily_bars). Marks the day in the
+    session manifest if every symbol was written; committing is up to the caller.
+    """
+    path = flatfile_path(session.cfg, day)
+    df = read_day_file(path, use_sidecar=session.cfg.flatfile_sidecars)
+    wm = session.watermarks
+
+    def committed(batch) -> None:
+        for sym, out in batch:
+            wm.advance(sym, out)
+            if session.symbols is not None:
+                session.symbols.observe(sym, out, "update")
+
+    res = write_bars_batch(
+        session.lib,
+        "1d",
+        iter_symbol_slices(df),
+        update=True,
+        profile=session.cfg.bar_profile,
+        batch_size=session.cfg.ingest_batch_size,
+        on_batch=committed,
+    )
+    if not res.failures:
+        session.stage_panels(df)
+        session.manifest.mark(day, rows=len(df), symbols=df["ticker"].nunique())
+    return res
+
+def day_info(day: dt.date, path: Path, res: BatchWriteResult) -> dict:
+    info = {"date": str(day), "file": str(path), "symbols": res.symbols, "rows_total": res.rows}
+    if res.skipped:
+        info["rows_skipped"] = res.skipped
+    if res.rejected:
+        info["rows_rejected"] = res.rejected
+    if res.failures:
+        info["failed_symbols"] = res.failures
+    return info
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import datetime as dt
-from collections import defaultdict
-from pathlib import Path
+import time
 
 import pandas as pd
-from arcticdb.exceptions import NoDataFoundException
 
+from marketlab.calendar import iter_sessions
 from marketlab.config import MarketlabConfig
-from marketlab.data.arctic import get_arctic, get_lib, key_bars
-from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path, is_day_ingested, mark_day_ingested
+from marketlab.data.arctic import BatchWriteResult
+from marketlab.data.polygon_massive.ingest_daily_from_cache import (
+    flatfile_path,
+    iter_symbol_slices,
+    read_day_file,
+    write_slices,
+)
+from marketlab.data.polygon_massive.manifest import IngestManifest
+from marketlab.data.polygon_massive.session import IngestSession
 
 def month_range(start: dt.date, end: dt.date):
     cur = dt.date(start.year, start.month, 1)
@@ -29,109 +35,106 @@ def days_in_month(year: int, month: int, start: dt.date, end: dt.date):
         nextm = dt.date(year, month + 1, 1)
     last = nextm - dt.timedelta(days=1)
 
-    lo = max(first, start)
-    hi = min(last, end)
-
-    d = lo
-    while d <= hi:
-        yield d
-        d += dt.timedelta(days=1)
-
-def ingest_month(cfg: MarketlabConfig, year: int, month: int, start: dt.date, end: dt.date) -> dict:
-    arctic = get_arctic(cfg.arctic_uri)
-    lib = get_lib(arctic, cfg.daily_lib)
-
-    # symbol -> list of rows (timestamp, open, high, low, close, volume)
-    rows = defaultdict(list)
+    return iter_sessions(max(first, start), min(last, end))
 
+def pending_month_days(manifest: IngestManifest, cfg: MarketlabConfig, year: int, month: int, start: dt.date, end: dt.date,
+                       cached: set[dt.date] | None = None) -> tuple[int, list[dt.date]]:
+    """
+    Returns (days_found, days_pending): days with a local file, and those of them
+    not yet in the ingest manifest. `cached` (from the cache catalog) replaces
+    the per-day stat.
+    """
     days_found = 0
-    days_ingested = 0
-    total_rows_read = 0
-
+    pending: list[dt.date] = []
     for day in days_in_month(year, month, start, end):
-        path = flatfile_path(cfg, day)
-        if not path.exists():
-            continue  # weekends/holidays or not downloaded
-
+        if not (day in cached if cached is not None else flatfile_path(cfg, day).exists()):
+            continue  # not downloaded
         days_found += 1
-
         # Skip whole day if already ingested (manifest)
-        if is_day_ingested(lib, cfg, day):
-            continue
-
-        df = pd.read_csv(path, compression="gzip")
-
-        # Expected schema (from your header):
-        # ticker,volume,open,close,high,low,window_start,transactions
-        required = {"ticker", "volume", "open", "close", "high", "low", "window_start"}
-        missing = required - set(df.columns)
-        if missing:
-            raise ValueError(f"Missing columns {sorted(missing)} in {path}")
-
-        # window_start is ns epoch
-        ts = pd.to_datetime(df["window_start"], unit="ns", utc=True)
-
-        # Add rows into per-symbol buffers
-        # Use itertuples for speed
-        df = df.assign(_ts=ts)
-        for r in df.itertuples(index=False):
-            # r.ticker, r.open, r.high, r.low, r.close, r.volume, r._ts
-            rows[r.ticker].append((r._ts, r.open, r.high, r.low, r.close, r.volume))
-
-        total_rows_read += len(df)
-        days_ingested += 1
-
-        # Mark the day ingested *after* it's buffered (we’ll persist after writing too)
-        # We'll mark after successful writes below to be safer.
-
-    # Nothing new this month
-    if days_ingested == 0:
-        return {
-            "month": f"{year:04d}-{month:02d}",
-            "days_found": days_found,
-            "days_ingested": 0,
-            "symbols_written": 0,
-            "rows_read": total_rows_read,
-            "rows_appended": 0,
-            "skipped": True,
-        }
-
-    # Write once per symbol for the month
-    symbols_written = 0
-    rows_appended = 0
-
-    for sym, lst in rows.items():
-        if not lst:
-            continue
-        out = pd.DataFrame(lst, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        out = out.set_index("timestamp").sort_index()
-
-        k = key_bars("1d", sym)
-        # Append (fast path). You can add optional dedupe later if needed.
-        lib.append(k, out)
-
-        symbols_written += 1
-        rows_appended += len(out)
-
-    # Now that writes succeeded, mark the ingested days in this month
-    for day in days_in_month(year, month, start, end):
-        path = flatfile_path(cfg, day)
-        if not path.exists():
+        if day in manifest:
             continue
-        if is_day_ingested(lib, cfg, day):
-            continue
-        # If we got here, we ingested it into buffers and wrote successfully.
-        # But how do we know which days were buffered? We can track them:
-        # simplest: re-check by file existence + not ingested before loop.
-        # Better: keep a list during read loop.
-        # We'll do the better way in the CLI layer (below) to avoid double reads.
-
-    return {
+        pending.append(day)
+    return days_found, pending
+
+def write_month(
+    session: IngestSession, days: list[dt.date], frames: list[pd.DataFrame], *, update: bool = False
+) -> tuple[int, BatchWriteResult]:
+    """
+    Concatenate a month of decoded day frames and write it once per symbol in
+    batches of cfg.ingest_batch_size. By default each symbol's slice is
+    appended and rows at or behind its watermark are skipped; with
+    update=True each slice replaces its own date range, so history behind
+    the watermark is filled in.
+
+    The days are marked ingested only if no symbol failed; the session is
+    committed either way (one watermark and one manifest write per month).
+    Returns (rows_read, write result).
+    """
+    counts = [(len(f), f["ticker"].nunique()) for f in frames]
+    df = pd.concat(frames, ignore_index=True)
+    res = write_slices(session, iter_symbol_slices(df), update=update, label=f"{days[0]:%Y-%m}")
+
+    # The symbols that were written are committed either way; with any failure the
+    # month stays unmarked so the next run retries it (watermarks skip the written rows).
+    if not res.failures:
+        session.stage_panels(df)
+        for day, (rows, symbols) in zip(days, counts):
+            session.manifest.mark(day, rows=rows, symbols=symbols)
+    session.commit()
+
+    return len(df), res
+
+def month_info(year: int, month: int, days_found: int, days_ingested: int, rows_read: int,
+               res: BatchWriteResult | None, elapsed: float, *, missing: list[dt.date] | None = None) -> dict:
+    res = res or BatchWriteResult()
+    info = {
         "month": f"{year:04d}-{month:02d}",
         "days_found": days_found,
         "days_ingested": days_ingested,
-        "symbols_written": symbols_written,
-        "rows_read": total_rows_read,
-        "rows_appended": rows_appended,
-        "skipped": False,
+        "symbols_written": res.symbols,
+        "rows_read": rows_read,
+        "rows_appended": res.rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_read / elapsed) if elapsed > 0 else None,
+        "skipped": days_ingested == 0,
     }
+    if res.skipped:
+        info["rows_skipped"] = res.skipped
+    if res.rejected:
+        info["rows_rejected"] = res.rejected
+    if res.failures:
+        info["failed_symbols"] = res.failures
+    if missing:
+        # listed in the cache catalog but the file was gone: dropped from the catalog, not ingested
+        info["missing_files"] = [str(d) for d in missing]
+    return info
+
+def ingest_month(
+    cfg: MarketlabConfig,
+    year: int,
+    month: int,
+    start: dt.date,
+    end: dt.date,
+    *,
+    session: IngestSession | None = None,
+) -> dict:
+    if session is None:
+        session = IngestSession.open(cfg)
+
+    t0 = time.perf_counter()
+
+    cached = session.catalog.days(start, end) if session.catalog is not None else None
+    days_found, days = pending_month_days(session.manifest, cfg, year, month, start, end, cached)
+    missing = session.catalog.drop_missing(days) if cached is not None else []
+    if missing:
+        days = [d for d in days if d not in missing]
+        days_found -= len(missing)
+
+    # Nothing new this month
+    if not days:
+        return month_info(year, month, days_found, 0, 0, None, 0.0, missing=missing)
+
+    frames = [read_day_file(flatfile_path(cfg, day), use_sidecar=cfg.flatfile_sidecars) for day in days]
+    rows_read, res = write_month(session, days, frames)
+
+    return month_info(year, month, days_found, len(days), rows_read, res, time.perf_counter() - t0, missing=missing)
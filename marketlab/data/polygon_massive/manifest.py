@@ -0,0 +1,119 @@
+# marketlab/data/polygon_massive/manifest.py
+from __future__ import annotations
+
+import datetime as dt
+
+import pandas as pd
+from arcticdb.exceptions import NoDataFoundException
+
+from marketlab.config import MarketlabConfig
+
+MANIFEST_COLUMNS = ["ingested", "rows", "symbols"]
+
+def manifest_key(cfg: MarketlabConfig) -> str:
+    return f"meta/ingested/{cfg.daily_symbol_set}"
+
+def _day_ts(day: dt.date) -> pd.Timestamp:
+    # store as UTC timestamps at 00:00 to compare consistently
+    return pd.Timestamp(day, tz="UTC")
+
+class IngestManifest:
+    """
+    The meta/ingested/{symbol_set} table, read once per run.
+
+    Membership is a set lookup; mark() only buffers, and commit() persists all
+    newly marked days with a single append (or a single rewrite when the new days
+    are not after the last stored one, or the stored table predates the
+    rows/symbols columns). rows/symbols are the per-day counts from the source
+    file, -1 where unknown.
+    """
+
+    def __init__(self, lib, cfg: MarketlabConfig, frame: pd.DataFrame | None = None):
+        self.lib = lib
+        self.key = manifest_key(cfg)
+        self._stored = frame
+        self._days: set[dt.date] = set() if frame is None else set(frame.index.date)
+        self._pending: dict[dt.date, tuple[int, int]] = {}
+
+    @classmethod
+    def load(cls, lib, cfg: MarketlabConfig) -> "IngestManifest":
+        try:
+            frame = lib.read(manifest_key(cfg)).data
+        except NoDataFoundException:
+            frame = None
+        return cls(lib, cfg, frame)
+
+    def __contains__(self, day: dt.date) -> bool:
+        return day in self._days
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def latest(self) -> dt.date | None:
+        return max(self._days, default=None)
+
+    def mark(self, day: dt.date, *, rows: int = -1, symbols: int = -1) -> None:
+        self._days.add(day)
+        self._pending[day] = (int(rows), int(symbols))
+
+    @property
+    def pending(self) -> list[dt.date]:
+        return sorted(self._pending)
+
+    def stats(self) -> pd.DataFrame:
+        """Per-day ingested/rows/symbols, committed and pending, indexed by UTC midnight."""
+        return self._merged()
+
+    def _pending_frame(self) -> pd.DataFrame:
+        days = self.pending
+        return pd.DataFrame(
+            index=pd.DatetimeIndex([_day_ts(d) for d in days]),
+            data={
+                "ingested": [True] * len(days),
+                "rows": [self._pending[d][0] for d in days],
+                "symbols": [self._pending[d][1] for d in days],
+            },
+        )
+
+    def _merged(self) -> pd.DataFrame:
+        new = self._pending_frame()
+        if self._stored is None or self._stored.empty:
+            return new
+        old = self._stored.reindex(columns=MANIFEST_COLUMNS)
+        old["ingested"] = True
+        old[["rows", "symbols"]] = old[["rows", "symbols"]].fillna(-1).astype("int64")
+        if new.empty:
+            return old
+        both = pd.concat([old, new])
+        return both[~both.index.duplicated(keep="last")].sort_index()
+
+    def commit(self) -> int:
+        """Persist newly marked days in one write. Returns the number of days committed."""
+        if not self._pending:
+            return 0
+        stored = self._stored
+        new = self._pending_frame()
+        can_append = (
+            stored is not None
+            and not stored.empty
+            and list(stored.columns) == MANIFEST_COLUMNS
+            and new.index[0] > stored.index[-1]
+        )
+        if can_append:
+            self.lib.append(self.key, new)
+            self._stored = pd.concat([stored, new])
+        else:
+            self._stored = self._merged()
+            self.lib.write(self.key, self._stored, prune_previous_versions=True)
+        n = len(self._pending)
+        self._pending.clear()
+        return n
+
+def is_day_ingested(lib, cfg: MarketlabConfig, day: dt.date) -> bool:
+    """Single-day check; loops over many days should load an IngestManifest once."""
+    return day in IngestManifest.load(lib, cfg)
+
+def mark_day_ingested(lib, cfg: MarketlabConfig, day: dt.date, *, rows: int = -1, symbols: int = -1) -> None:
+    m = IngestManifest.load(lib, cfg)
+    m.mark(day, rows=rows, symbols=symbols)
+    m.commit()
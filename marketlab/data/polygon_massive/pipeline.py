@@ -0,0 +1,210 @@
+# marketlab/data/polygon_massive/pipeline.py
+"""
+Producer/consumer ingestion:
+
+    parent ──paths──> process pool (gzip + CSV decode, normalize)
+       │                     │
+       └──<── frames ────────┘
+       │
+       └── bounded queue ──> writer process (sole owner of the Arctic library)
+
+The LMDB store is single-writer, so every Arctic call (manifest checks
+included) happens in the writer. The parent only schedules decodes and
+forwards decoded batches in order; at most `queue_size` batches wait for the
+writer and at most `2 * workers` days are decoded ahead of it.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.ingest_daily_from_cache import (
+    day_info,
+    flatfile_path,
+    read_day_file,
+    write_day_frame,
+)
+from marketlab.data.polygon_massive.ingest_daily_monthly import (
+    days_in_month,
+    month_info,
+    month_range,
+    pending_month_days,
+    write_month,
+)
+from marketlab.data.polygon_massive.manifest import IngestManifest
+from marketlab.data.polygon_massive.session import IngestSession
+
+# A batch is written as one unit by the writer: ("month", "YYYY-MM", days) or ("day", "YYYY-MM-DD", [day])
+Batch = tuple[str, str, list[dt.date]]
+
+def _plan(manifest: IngestManifest, cfg: MarketlabConfig, batches: list[Batch], append: bool,
+          catalog: FlatfileCatalog | None = None) -> list[tuple[Batch, int, list[dt.date]]]:
+    """
+    Drop days already in the manifest, and days the catalog lists whose file
+    is gone; returns [(batch, days_found, missing days)] for every batch.
+    """
+    cached = catalog.days() if catalog is not None else None
+    planned = []
+    for kind, label, days in batches:
+        if kind == "month":
+            year, month = map(int, label.split("-"))
+            found, pending = pending_month_days(manifest, cfg, year, month, days[0], days[-1], cached)
+        else:
+            found = len(days)
+            pending = [d for d in days if not (append and d in manifest)]
+        missing = catalog.drop_missing(pending) if catalog is not None else []
+        if missing:
+            pending = [d for d in pending if d not in missing]
+            found -= len(missing)
+        planned.append(((kind, label, pending), found, missing))
+    return planned
+
+def _writer_main(cfg: MarketlabConfig, append: bool, batches: list[Batch], write_q, result_q) -> None:
+    try:
+        session = IngestSession.open(cfg)
+        planned = _plan(session.manifest, cfg, batches, append, session.catalog)
+        missing = {label: m for (_, label, _), _, m in planned}
+        result_q.put(("plan", planned))
+
+        while True:
+            item = write_q.get()
+            if item is None:
+                session.commit()
+                break
+            (kind, label, days), found, frames = item
+            t0 = time.perf_counter()
+            if kind == "month":
+                rows_read, res = write_month(session, days, frames)
+                year, month = map(int, label.split("-"))
+                info = month_info(year, month, found, len(days), rows_read, res, time.perf_counter() - t0,
+                                  missing=missing[label])
+            else:
+                # day batches are watermark-filtered, so their session is committed once at the end
+                res = write_day_frame(session, days[0], frames[0], append=append)
+                info = day_info(days[0], flatfile_path(cfg, days[0]), res)
+            result_q.put(("info", info))
+    except BaseException:
+        result_q.put(("error", traceback.format_exc()))
+        return
+    result_q.put(("done", None))
+
+def _get(result_q, writer) -> tuple[str, object]:
+    while True:
+        try:
+            msg = result_q.get(timeout=1.0)
+        except queue.Empty:
+            if not writer.is_alive():
+                raise RuntimeError("Arctic writer process exited unexpectedly")
+            continue
+        if msg[0] == "error":
+            raise RuntimeError(f"Arctic writer failed:\n{msg[1]}")
+        return msg
+
+def _put(write_q, item, result_q, writer, infos: list) -> None:
+    """Blocking put that notices a dead writer instead of hanging on a full queue."""
+    while True:
+        try:
+            write_q.put(item, timeout=1.0)
+            return
+        except queue.Full:
+            _drain(result_q, writer, infos)
+            if not writer.is_alive():
+                raise RuntimeError("Arctic writer process exited unexpectedly")
+
+def _drain(result_q, writer, infos: list) -> None:
+    while True:
+        try:
+            msg = result_q.get_nowait()
+        except queue.Empty:
+            return
+        if msg[0] == "error":
+            raise RuntimeError(f"Arctic writer failed:\n{msg[1]}")
+        infos.append(msg[1])
+
+def run_pipeline(
+    cfg: MarketlabConfig,
+    batches: list[Batch],
+    *,
+    workers: int,
+    append: bool = True,
+    queue_size: int = 2,
+) -> Iterator[dict]:
+    """
+    Decode day files on `workers` processes and write them through a single
+    writer process. Yields one info dict per batch: months with nothing
+    pending are reported up front, written batches in order as they commit.
+    """
+    ctx = mp.get_context("spawn")  # never fork a process holding an open LMDB env
+    write_q = ctx.Queue(maxsize=queue_size)
+    result_q = ctx.Queue()
+    writer = ctx.Process(
+        target=_writer_main, args=(cfg, append, batches, write_q, result_q), name="arctic-writer", daemon=True
+    )
+    writer.start()
+
+    try:
+        _, planned = _get(result_q, writer)
+        for (kind, label, days), found, missing in planned:
+            if days:
+                continue
+            if kind == "month":
+                year, month = map(int, label.split("-"))
+                yield month_info(year, month, found, 0, 0, None, 0.0, missing=missing)
+            elif missing:
+                yield {"date": label, "file": str(flatfile_path(cfg, missing[0])), "symbols": 0, "rows_total": 0,
+                       "skipped": True, "missing_file": True}
+        planned = [(b, found) for b, found, _ in planned if b[2]]
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            jobs = iter([flatfile_path(cfg, d) for (_, _, days), _ in planned for d in days])
+            inflight: deque = deque()
+
+            def fill() -> None:
+                while len(inflight) < 2 * workers:
+                    path = next(jobs, None)
+                    if path is None:
+                        return
+                    inflight.append(pool.submit(read_day_file, path, use_sidecar=cfg.flatfile_sidecars))
+
+            fill()
+            infos: list[dict] = []
+            for batch, found in planned:
+                frames = []
+                for _ in batch[2]:
+                    frames.append(inflight.popleft().result())
+                    fill()
+                _put(write_q, (batch, found, frames), result_q, writer, infos)
+                del frames
+                yield from infos
+                infos.clear()
+
+        _put(write_q, None, result_q, writer, infos)
+        yield from infos
+        while True:
+            kind, info = _get(result_q, writer)
+            if kind == "done":
+                break
+            yield info
+    finally:
+        writer.join(timeout=5.0)
+        if writer.is_alive():
+            writer.terminate()
+
+def month_batches(start: dt.date, end: dt.date) -> list[Batch]:
+    batches = [
+        ("month", f"{y:04d}-{m:02d}", list(days_in_month(y, m, start, end)))
+        for y, m in month_range(start, end)
+    ]
+    return [b for b in batches if b[2]]  # a window can hold no sessions of a month
+
+def day_batches(cfg: MarketlabConfig, days) -> list[Batch]:
+    cached = FlatfileCatalog.for_config(cfg).days()
+    return [("day", str(d), [d]) for d in days if d in cached]
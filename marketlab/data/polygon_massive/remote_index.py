@@ -0,0 +1,92 @@
+# marketlab/data/polygon_massive/remote_index.py
+"""
+Cached listing of the remote flatfile bucket, one entry per year/month prefix:
+
+    {"2024/01": {"listed_at": "2024-02-09T08:00:00", "objects": {key: {"size": ..., "etag": ...}}}}
+
+Each month is listed once with a paginated list_objects_v2, retried like the
+downloads (with_backoff, cfg.download_max_retries). A listing taken more than
+SETTLE_DAYS after the month ended is final and never repeated;
+listings of the current or a just-finished month are refreshed on the next
+run that needs them, so new days are picked up with one LIST per month.
+"""
+from __future__ import annotations
+
+import calendar
+import datetime as dt
+import json
+from pathlib import Path
+from typing import Iterable
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.retry import with_backoff
+
+SETTLE_DAYS = 7
+
+def month_prefix(cfg: MarketlabConfig, year: int, month: int) -> str:
+    return f"{cfg.daily_symbol_set}/{year:04d}/{month:02d}/"
+
+def list_month(s3, bucket: str, prefix: str) -> dict[str, dict]:
+    """key -> {"size", "etag"} for every object under `prefix`."""
+    out: dict[str, dict] = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            out[obj["Key"]] = {"size": int(obj["Size"]), "etag": obj.get("ETag", "").strip('"')}
+    return out
+
+class RemoteIndex:
+    def __init__(self, path: Path, months: dict[str, dict] | None = None):
+        self.path = path
+        self.months: dict[str, dict] = months or {}
+        self._dirty = False
+
+    @classmethod
+    def for_config(cls, cfg: MarketlabConfig) -> "RemoteIndex":
+        path = cfg.massive_cache_dir / cfg.daily_symbol_set / "_remote_index.json"
+        try:
+            months = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            months = {}
+        return cls(path, months)
+
+    def is_final(self, year: int, month: int) -> bool:
+        entry = self.months.get(f"{year:04d}/{month:02d}")
+        if entry is None:
+            return False
+        month_end = dt.date(year, month, calendar.monthrange(year, month)[1])
+        listed = dt.datetime.fromisoformat(entry["listed_at"]).date()
+        return listed > month_end + dt.timedelta(days=SETTLE_DAYS)
+
+    def ensure(
+        self, s3, bucket: str, cfg: MarketlabConfig, months: Iterable[tuple[int, int]], *, refresh: bool = False
+    ) -> int:
+        """List every month in `months` whose entry is missing or not final. Returns the number of months listed."""
+        listed = 0
+        for year, month in months:
+            if not refresh and self.is_final(year, month):
+                continue
+            prefix = month_prefix(cfg, year, month)
+            objects = with_backoff(lambda: list_month(s3, bucket, prefix), max_retries=cfg.download_max_retries)
+            self.months[f"{year:04d}/{month:02d}"] = {
+                "listed_at": dt.datetime.now().isoformat(timespec="seconds"),
+                "objects": objects,
+            }
+            listed += 1
+            self._dirty = True
+        return listed
+
+    def get(self, key: str) -> dict | None:
+        """{"size", "etag"} of `key`, or None if it was not in its month's listing."""
+        # key: {symbol_set}/YYYY/MM/YYYY-MM-DD.csv.gz
+        parts = key.rsplit("/", 3)
+        entry = self.months.get(f"{parts[-3]}/{parts[-2]}") if len(parts) == 4 else None
+        return None if entry is None else entry["objects"].get(key)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".partial")
+        tmp.write_text(json.dumps(self.months, sort_keys=True))
+        tmp.replace(self.path)
+        self._dirty = False
@@ -0,0 +1,37 @@
+# marketlab/data/polygon_massive/retry.py
+"""Retry policy for S3 calls against the flatfile bucket (GET and LIST alike)."""
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable, TypeVar
+
+from botocore.exceptions import ClientError, ReadTimeoutError, ResponseStreamingError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+T = TypeVar("T")
+
+THROTTLE_CODES = {
+    "SlowDown", "Throttling", "ThrottlingException", "RequestLimitExceeded",
+    "TooManyRequests", "RequestThrottled", "429", "500", "503", "InternalError", "ServiceUnavailable",
+}
+_TRANSIENT_ERRORS = (BotoConnectionError, ReadTimeoutError, ResponseStreamingError)
+
+def is_retryable(e: Exception) -> bool:
+    if isinstance(e, ClientError):
+        err = e.response.get("Error", {})
+        status = str(e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", ""))
+        return err.get("Code") in THROTTLE_CODES or status in THROTTLE_CODES
+    return isinstance(e, _TRANSIENT_ERRORS)
+
+def with_backoff(fn: Callable[[], T], *, max_retries: int, base_delay: float = 0.5, max_delay: float = 30.0) -> T:
+    """Call fn(), retrying throttling / transient errors with exponential backoff and full jitter."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
+            attempt += 1
@@ -0,0 +1,179 @@
+# marketlab/data/polygon_massive/scheduler.py
+"""
+Download scheduling for an empty (or stale) flatfile cache:
+
+  1. the most recent `recent_sessions` missing sessions, at full concurrency,
+     so they can be ingested right away;
+  2. the remaining history, newest first, on a background thread with its own
+     small pool and a shared bandwidth cap.
+
+There is no separate state file: a day is done once the catalog has it, and
+interrupted downloads never leave more than a .partial behind, so a restarted
+scheduler re-plans from the catalog and continues where it stopped.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Callable, Iterator
+
+from marketlab.calendar import iter_sessions, sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.download_daily_flatfiles import (
+    DownloadProgress,
+    RateLimiter,
+    fetch_days,
+    local_path_for_date,
+    make_s3_client,
+    s3_key_for_date,
+)
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path, read_day_file
+from marketlab.data.polygon_massive.ingest_daily_monthly import month_info, write_month
+from marketlab.data.polygon_massive.remote_index import RemoteIndex
+from marketlab.data.polygon_massive.session import IngestSession
+
+@dataclass
+class SchedulePlan:
+    recent: list[dt.date]  # newest first
+    history: list[dt.date]  # newest first
+    missing_remote: int = 0
+
+@dataclass
+class HistoryState:
+    downloaded: list[dt.date] = field(default_factory=list)
+    failed: dict[dt.date, str] = field(default_factory=dict)
+    done: bool = False
+
+class DownloadScheduler:
+    def __init__(
+        self,
+        cfg: MarketlabConfig,
+        *,
+        bucket: str,
+        recent_sessions: int = 20,
+        workers: int | None = None,
+        history_workers: int = 2,
+        bandwidth: int | None = None,  # bytes/s for the history phase; None = unlimited
+        s3=None,
+    ):
+        self.cfg = cfg
+        self.bucket = bucket
+        self.recent_sessions = recent_sessions
+        self.workers = workers or cfg.download_workers
+        self.history_workers = history_workers
+        self.limiter = RateLimiter(bandwidth) if bandwidth else None
+        self.s3 = s3 if s3 is not None else make_s3_client(cfg, max_pool_connections=self.workers + history_workers)
+        self.catalog = FlatfileCatalog.for_config(cfg)
+        self.index = RemoteIndex.for_config(cfg)
+        self.history = HistoryState()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def plan(self, start: dt.date, end: dt.date) -> SchedulePlan:
+        """Sessions in [start, end] that are published but not cached, split into recent and history."""
+        days = list(iter_sessions(start, end))
+        self.index.ensure(self.s3, self.bucket, self.cfg, sorted({(d.year, d.month) for d in days}))
+        self.index.save()
+        cached = self.catalog.days(start, end)
+        missing = [d for d in reversed(days) if d not in cached]
+        available = [d for d in missing if self.index.get(s3_key_for_date(self.cfg, d)) is not None]
+        n = self.recent_sessions
+        return SchedulePlan(available[:n], available[n:], len(missing) - len(available))
+
+    def _todo(self, days: list[dt.date]):
+        return [(d, s3_key_for_date(self.cfg, d), local_path_for_date(self.cfg, d)) for d in days]
+
+    def fetch_recent(
+        self, plan: SchedulePlan, progress: Callable[[DownloadProgress], None] | None = None
+    ) -> tuple[list[dt.date], dict[dt.date, str]]:
+        """Download plan.recent at full concurrency (no bandwidth cap). Returns (downloaded, failed)."""
+        downloaded, failed, _ = fetch_days(
+            self.cfg, self.s3, self.bucket, self._todo(plan.recent),
+            index=self.index, catalog=self.catalog, workers=self.workers, progress=progress,
+        )
+        return downloaded, failed
+
+    def start_history(self, plan: SchedulePlan, *, chunk: int = 16) -> threading.Thread:
+        """
+        Download plan.history on a background thread, `chunk` days at a time
+        on history_workers threads under the bandwidth cap. stop() takes
+        effect between chunks.
+        """
+
+        def run() -> None:
+            # the catalog's sqlite connection belongs to the thread that opened it
+            catalog = FlatfileCatalog.for_config(self.cfg)
+            try:
+                for i in range(0, len(plan.history), chunk):
+                    if self._stop.is_set():
+                        break
+                    downloaded, failed, _ = fetch_days(
+                        self.cfg, self.s3, self.bucket, self._todo(plan.history[i:i + chunk]),
+                        index=self.index, catalog=catalog, workers=self.history_workers, limiter=self.limiter,
+                    )
+                    self.history.downloaded.extend(downloaded)
+                    self.history.failed.update(failed)
+            finally:
+                catalog.close()
+                self.history.done = True
+
+        self._thread = threading.Thread(target=run, name="marketlab-history-download", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: float | None = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.history.done
+
+def contiguous_runs(days: list[dt.date]) -> Iterator[list[dt.date]]:
+    """
+    Split sorted days into runs of consecutive sessions. A run can be written
+    with update semantics (which replace the run's whole date range) without
+    touching a session outside the run.
+    """
+    run: list[dt.date] = []
+    for d in days:
+        if run and len(sessions(run[-1] + dt.timedelta(days=1), d - dt.timedelta(days=1))):
+            yield run
+            run = []
+        run.append(d)
+    if run:
+        yield run
+
+def ingest_cached_days(session: IngestSession, days: list[dt.date]) -> Iterator[dict]:
+    """
+    Ingest cached days in any order relative to what is stored: each run of
+    consecutive sessions is written month by month with update semantics,
+    so recent days ingested first and history filled in later both land in
+    place. A run behind the stored days is written newest month first, so
+    each month precedes what the symbol catalog already summarizes and
+    extends it instead of forcing a full re-read per symbol at commit.
+    Yields one month_info per month written; the session is committed per
+    month. Days whose cached file is gone are dropped from the catalog and
+    reported (missing_files) instead of read.
+    """
+    missing = session.catalog.drop_missing(days) if session.catalog is not None else []
+    if missing:
+        for (year, month), group in groupby(missing, key=lambda d: (d.year, d.month)):
+            yield month_info(year, month, 0, 0, 0, None, 0.0, missing=list(group))
+        days = [d for d in days if d not in missing]
+    for run in contiguous_runs(sorted(days)):
+        latest = session.manifest.latest()
+        months = [list(g) for _, g in groupby(run, key=lambda d: (d.year, d.month))]
+        if latest is not None and run[-1] < latest:
+            months.reverse()
+        for group in months:
+            year, month = group[0].year, group[0].month
+            t0 = time.perf_counter()
+            cfg = session.cfg
+            frames = [read_day_file(flatfile_path(cfg, d), use_sidecar=cfg.flatfile_sidecars) for d in group]
+            rows_read, res = write_month(session, group, frames, update=True)
+            yield month_info(year, month, len(group), len(group), rows_read, res, time.perf_counter() - t0)
@@ -0,0 +1,91 @@
+# marketlab/data/polygon_massive/session.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic, get_lib, stored_bar_profile
+from marketlab.data.panels import PanelStore, get_panel_lib
+from marketlab.data.symbol_catalog import SymbolCatalog
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.checkpoint import CheckpointJournal
+from marketlab.data.polygon_massive.manifest import IngestManifest
+from marketlab.data.polygon_massive.watermarks import SymbolWatermarks
+
+def check_bar_profile(lib, cfg: MarketlabConfig, watermarks: SymbolWatermarks) -> None:
+    """
+    Refuse to write bars under a profile other than the one the store holds
+    (ArcticDB rejects every append with a mismatched dtype). One stored symbol
+    is sampled; scripts/convert_bar_profile.py converts a whole store.
+    """
+    sample = watermarks.symbols()[:1]
+    stored = stored_bar_profile(lib, "1d", sample[0]) if sample else None
+    if stored is not None and stored != cfg.bar_profile:
+        raise ValueError(
+            f"Bars in {cfg.daily_lib!r} are stored with the {stored!r} profile but MARKETLAB_BAR_PROFILE is "
+            f"{cfg.bar_profile!r}; set it back to {stored!r} or convert the store with "
+            f"python -m marketlab.scripts.convert_bar_profile --to {cfg.bar_profile}"
+        )
+
+@dataclass
+class IngestSession:
+    """
+    Per-run ingestion state shared by every day/month written in the run:
+    the daily library handle, the ingest manifest, the symbol watermarks and
+    the flatfile cache catalog, plus the symbol catalog and the wide panels
+    (cfg.wide_panels). catalog=False opens the session without the cache
+    catalog, for runs that never touch the flatfile cache (streaming without tee).
+    commit() first writes the days staged into the panels, then persists
+    watermarks and manifest and stamps the committed days in the catalog; in
+    between, every write batch is journaled so an interrupted run resumes
+    where it stopped.
+    """
+    cfg: MarketlabConfig
+    lib: object
+    manifest: IngestManifest
+    watermarks: SymbolWatermarks
+    journal: CheckpointJournal
+    catalog: FlatfileCatalog | None = field(default=None, repr=False)
+    resumed_symbols: int = 0  # symbols whose watermark came from the journal on open
+    panels: PanelStore | None = field(default=None, repr=False)
+    symbols: SymbolCatalog | None = field(default=None, repr=False)
+
+    @classmethod
+    def open(cls, cfg: MarketlabConfig, lib=None, *, catalog: bool = True) -> "IngestSession":
+        arctic = get_arctic(cfg.arctic_uri)
+        if lib is None:
+            lib = get_lib(arctic, cfg.daily_lib)
+        panels = None
+        if cfg.wide_panels:
+            price_dtype = "float32" if cfg.bar_profile == "compact" else "float64"
+            panels = PanelStore(get_panel_lib(arctic, cfg.panel_lib), price_dtype=price_dtype)
+        watermarks = SymbolWatermarks.load(lib, cfg)
+        check_bar_profile(lib, cfg, watermarks)
+        journal = CheckpointJournal.for_config(cfg)
+        replayed = journal.replay()
+        watermarks.apply(replayed)
+        symbols = SymbolCatalog.load(lib, cfg)
+        symbols.mark_stale(replayed)  # batches written after the last commit are not in the catalog
+        return cls(
+            cfg, lib, IngestManifest.load(lib, cfg), watermarks, journal,
+            FlatfileCatalog.for_config(cfg) if catalog else None, len(replayed), panels, symbols,
+        )
+
+    def stage_panels(self, df) -> None:
+        """Queue a decoded long frame for the wide panels (written by the next commit)."""
+        if self.panels is not None:
+            self.panels.stage(df)
+
+    def commit(self) -> None:
+        # panels before the manifest: a crash in between re-ingests the days, and flush() merges them again
+        if self.panels is not None:
+            self.panels.flush()
+        # watermarks first: a manifest day must never outlive the bars' watermark
+        self.watermarks.commit()
+        if self.symbols is not None:
+            self.symbols.commit()
+        committed = self.manifest.pending
+        self.manifest.commit()
+        self.journal.clear()
+        if self.catalog is not None:
+            self.catalog.mark_ingested(committed)
@@ -0,0 +1,147 @@
+# marketlab/data/polygon_massive/stream_ingest.py
+"""
+Download-and-ingest without a flatfile cache:
+
+    S3 get_object body ──gzip──> CSV parse ──> normalize_day_frame ──> write_day_frame
+        (thread pool, decodes run ahead)          (caller's thread, date order)
+
+Each day's body is decoded straight from the HTTP stream on a worker thread;
+the calling thread writes finished days in date order (appends must not go
+behind a symbol's watermark) while later days are still downloading. With
+tee=True the raw .csv.gz bytes are also written to the cache (via .partial)
+and recorded in the catalog; without it nothing is written under the cache
+directory (the remote index is kept in memory and the session can be opened
+with catalog=False).
+"""
+from __future__ import annotations
+
+import datetime as dt
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+from botocore.exceptions import ClientError
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.columnar_cache import read_csv_raw
+from marketlab.data.polygon_massive.download_daily_flatfiles import (
+    MISSING_CODES,
+    local_path_for_date,
+    make_s3_client,
+    s3_key_for_date,
+    with_backoff,
+)
+from marketlab.data.polygon_massive.ingest_daily_from_cache import day_info, normalize_day_frame, write_day_frame
+from marketlab.data.polygon_massive.remote_index import RemoteIndex
+from marketlab.data.polygon_massive.session import IngestSession
+
+class TeeReader:
+    """Binary reader that copies everything read from `raw` into `sink`."""
+
+    def __init__(self, raw, sink):
+        self.raw = raw
+        self.sink = sink
+
+    def read(self, n: int = -1) -> bytes:
+        b = self.raw.read(n)
+        self.sink.write(b)
+        return b
+
+    def drain(self) -> None:
+        while self.read(1 << 20):
+            pass
+
+def fetch_day_frame(s3, bucket: str, key: str, *, tee_path: Path | None = None) -> pd.DataFrame | None:
+    """
+    Decode one remote day file from its response stream (None if the object
+    does not exist). With tee_path the compressed bytes are also landed there.
+    """
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in MISSING_CODES:
+            return None
+        raise
+    if tee_path is None:
+        return normalize_day_frame(read_csv_raw(body), key)
+
+    tee_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tee_path.with_suffix(tee_path.suffix + ".partial")
+    try:
+        with tmp.open("wb") as f:
+            reader = TeeReader(body, f)
+            df = normalize_day_frame(read_csv_raw(reader), key)
+            reader.drain()  # the parser may stop before the gzip trailer
+        tmp.replace(tee_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return df
+
+def stream_ingest_days(
+    cfg: MarketlabConfig,
+    days: Iterable[dt.date],
+    *,
+    bucket: str,
+    session: IngestSession,
+    workers: int | None = None,
+    s3=None,
+    tee: bool = False,
+) -> Iterator[dict]:
+    """
+    Download, decode and append each day in `days` that is in the remote
+    index and not in the manifest; yields one day_info per day written (the
+    session is not committed here). At most 2 * workers decoded days wait
+    for the writer. A day that still fails after retries stops the run, since
+    later days appended past it would put it behind the watermarks.
+    """
+    workers = workers or cfg.download_workers
+    if s3 is None:
+        s3 = make_s3_client(cfg, max_pool_connections=workers)
+    catalog = (session.catalog or FlatfileCatalog.for_config(cfg)) if tee else None
+
+    todo = sorted(d for d in days if d not in session.manifest)
+    if not todo:
+        return
+    index = RemoteIndex.for_config(cfg)
+    index.ensure(s3, bucket, cfg, sorted({(d.year, d.month) for d in todo}))
+    if tee:
+        index.save()
+    todo = [d for d in todo if index.get(s3_key_for_date(cfg, d)) is not None]
+
+    def job(day: dt.date) -> tuple[pd.DataFrame | None, float]:
+        t0 = time.perf_counter()
+        key = s3_key_for_date(cfg, day)
+        tee_path = local_path_for_date(cfg, day) if tee else None
+        df = with_backoff(
+            lambda: fetch_day_frame(s3, bucket, key, tee_path=tee_path), max_retries=cfg.download_max_retries
+        )
+        return df, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as ex:
+        ahead: deque = deque()
+        it = iter(todo)
+        for day in it:
+            ahead.append((day, ex.submit(job, day)))
+            if len(ahead) >= 2 * workers:
+                break
+        while ahead:
+            day, fut = ahead.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                ahead.append((nxt, ex.submit(job, nxt)))
+            df, fetch_s = fut.result()
+            if df is None:
+                continue
+            key = s3_key_for_date(cfg, day)
+            if catalog is not None:
+                catalog.record_download(day, local_path_for_date(cfg, day), etag=index.get(key)["etag"])
+            t0 = time.perf_counter()
+            res = write_day_frame(session, day, df, append=True)
+            info = day_info(day, key, res)
+            info["fetch_decode_seconds"] = round(fetch_s, 3)
+            info["write_seconds"] = round(time.perf_counter() - t0, 3)
+            yield info
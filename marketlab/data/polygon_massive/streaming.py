@@ -0,0 +1,130 @@
+# marketlab/data/polygon_massive/streaming.py
+"""
+Bounded-memory ingestion for long backfills.
+
+Day files are read in chunks of `chunk_rows` rows and buffered as columnar
+frames; when the buffer reaches a third of the memory budget (the flush
+concatenates and sorts, which roughly triples it) it is written per symbol
+and released. A day is marked in the manifest only once all of its rows have
+been flushed without a failed symbol, and the session is committed after
+every flush.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import re
+import resource
+import sys
+import time
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import iter_flatfile_chunks
+from marketlab.data.polygon_massive.ingest_daily_from_cache import (
+    flatfile_path,
+    iter_symbol_slices,
+    normalize_day_frame,
+    write_slices,
+)
+from marketlab.data.polygon_massive.session import IngestSession
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+def parse_size(s: str) -> int:
+    """'2GB', '512M', '1.5g', '1000000' -> bytes (binary units)."""
+    m = _SIZE_RE.match(s)
+    if not m:
+        raise ValueError(f"Invalid size: {s!r}")
+    return int(float(m.group(1)) * _UNITS[m.group(2).upper()])
+
+def peak_rss_bytes(who: int = resource.RUSAGE_SELF) -> int:
+    """Peak RSS of this process (or, with RUSAGE_CHILDREN, its largest waited-for child)."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux reports KiB
+
+def ingest_streaming(
+    cfg: MarketlabConfig,
+    days: Iterable[dt.date],
+    *,
+    max_memory: int,
+    chunk_rows: int = 200_000,
+    session: IngestSession | None = None,
+) -> Iterator[dict]:
+    """Append `days` (skipping manifest days) within ~max_memory bytes; yields one info dict per flush."""
+    if session is None:
+        session = IngestSession.open(cfg)
+    flush_at = max(max_memory // 3, 1)
+
+    buf: list[pd.DataFrame] = []
+    buf_bytes = 0
+    done: list[tuple[dt.date, int, int]] = []  # fully read days waiting for a flush
+    partial: dict[dt.date, list] = {}  # day being read -> [rows, tickers seen]
+    failed: set[dt.date] = set()  # days with rows in a flush where a symbol failed; left for the next run
+    missing: list[dt.date] = []  # listed in the catalog but the file was gone; reported with the next flush
+
+    def flush(reason: str) -> dict:
+        nonlocal buf, buf_bytes
+        t0 = time.perf_counter()
+        df = pd.concat(buf, ignore_index=True) if buf else None
+        buf, flushed = [], buf_bytes
+        buf_bytes = 0
+        res = write_slices(session, iter_symbol_slices(df), label=reason) if df is not None else None
+        if res and res.failures:
+            failed.update(d for d, _, _ in done)
+            failed.update(partial)
+        elif df is not None:
+            session.stage_panels(df)
+        for day, rows, symbols in done:
+            if day not in failed:
+                session.manifest.mark(day, rows=rows, symbols=symbols)
+        session.commit()
+        info = {
+            "flush": reason,
+            "days_completed": [str(d) for d, _, _ in done if d not in failed],
+            "rows": 0 if df is None else len(df),
+            "rows_appended": res.rows if res else 0,
+            "symbols_written": res.symbols if res else 0,
+            "buffered_bytes": flushed,
+            "seconds": round(time.perf_counter() - t0, 3),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+        if res and res.skipped:
+            info["rows_skipped"] = res.skipped
+        if res and res.rejected:
+            info["rows_rejected"] = res.rejected
+        if res and res.failures:
+            info["failed_symbols"] = res.failures
+        if missing:
+            info["missing_files"] = [str(d) for d in missing]
+            missing.clear()
+        done.clear()
+        return info
+
+    cached = session.catalog.days() if session.catalog is not None else None
+    for day in days:
+        if day in session.manifest:
+            continue
+        path = flatfile_path(cfg, day)
+        if not (day in cached if cached is not None else path.exists()):
+            continue
+        if cached is not None and session.catalog.drop_missing([day]):
+            missing.append(day)
+            continue
+        acc = partial.setdefault(day, [0, set()])
+        for raw in iter_flatfile_chunks(path, chunk_rows, use_sidecar=cfg.flatfile_sidecars):
+            chunk = normalize_day_frame(raw, path)
+            del raw
+            acc[0] += len(chunk)
+            acc[1].update(chunk["ticker"].unique())
+            buf.append(chunk)
+            buf_bytes += int(chunk.memory_usage(deep=True).sum())
+            if buf_bytes >= flush_at:
+                yield flush("budget")
+        rows, tickers = partial.pop(day)
+        done.append((day, rows, len(tickers)))
+
+    if buf or done or missing:
+        yield flush("end")
@@ -21,6 +21,10 @@ import numpy as np
 
 import arcticdb as adb
 
+from marketlab.calendar import iter_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import read_flatfile
+
 from datetime import date, timedelta
 
 MAX_YEARS_BACK = 5  # how many years the subscription allows
@@ -72,7 +76,7 @@ def get_last_date_in_arctic(lib) -> date | None:
 
 def get_dates_to_update(lib, end_date: date) -> list[date]:
     """
-    Return calendar dates we still need to download,
+    Return trading sessions we still need to download,
     from max(hist_start, last_seen+1) through end_date inclusive.
     """
     hist_start = compute_hist_start()
@@ -86,11 +90,7 @@ def get_dates_to_update(lib, end_date: date) -> list[date]:
     if cur > end_date:
         return []
 
-    dates = []
-    while cur <= end_date:
-        dates.append(cur)
-        cur += timedelta(days=1)
-    return dates
+    return list(iter_sessions(cur, end_date))
 
 def s3_key_for_date(d: date) -> str:
     return f"{DAY_AGGS_PREFIX}/{d.year:04d}/{d.month:02d}/{d.isoformat()}.csv.gz"
@@ -122,13 +122,17 @@ def ensure_local_file_for_date(s3, d: date) -> Path | None:
         # Any other error is "real", so re-raise.
         raise
 
-def load_daily_df_from_file(path):
+def load_daily_df_from_file(path, *, use_sidecar: bool | None = None):
 
-    # Read ticker as string; don't auto-convert blanks/"NA"/etc. to NaN
-    df = pd.read_csv(path, compression="gzip", keep_default_na=False)
+    # Read ticker as string; don't auto-convert "NA"/etc. to NaN. Blank cells are NaN
+    # (a blank ticker is put back to "" below), so numeric columns stay numeric.
+    # Goes through the typed .arrow sidecar cache when one is current (cfg.flatfile_sidecars).
+    if use_sidecar is None:
+        use_sidecar = MarketlabConfig().flatfile_sidecars
+    df = read_flatfile(Path(path), use_sidecar=use_sidecar)
 
     # needed because some objects are being read as string[python] which arcticdb rejects:
-    df["ticker"] = df["ticker"].astype("object")
+    df["ticker"] = df["ticker"].fillna("").astype("object")
     # strip whitespace:
     df["ticker"] = df["ticker"].str.strip()
 
@@ -0,0 +1,142 @@
+# marketlab/data/polygon_massive/watermarks.py
+from __future__ import annotations
+
+import pandas as pd
+from arcticdb.exceptions import NoDataFoundException
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import key_bars
+
+BARS_PREFIX = key_bars("1d", "")
+
+def watermarks_key(cfg: MarketlabConfig) -> str:
+    return f"meta/watermarks/{cfg.daily_symbol_set}"
+
+class SymbolWatermarks:
+    """
+    Last bar timestamp per bars/1d symbol, kept in one catalog symbol
+    (meta/watermarks/{symbol_set}) so appends can drop already-stored rows
+    without reading any bars.
+
+    The catalog is read once; advance() updates it in memory and commit()
+    rewrites it in one write. A store that predates the catalog is bootstrapped
+    once from the tail row of every bars/1d symbol.
+    """
+
+    def __init__(self, lib, cfg: MarketlabConfig, last: dict[str, int] | None = None):
+        self.lib = lib
+        self.key = watermarks_key(cfg)
+        self._last: dict[str, int] = dict(last or {})  # symbol -> ns since epoch, UTC
+        self._dirty = False
+
+    @classmethod
+    def load(cls, lib, cfg: MarketlabConfig) -> "SymbolWatermarks":
+        try:
+            df = lib.read(watermarks_key(cfg)).data
+        except NoDataFoundException:
+            wm = cls(lib, cfg)
+            wm.rebuild()
+            return wm
+        return cls(lib, cfg, dict(zip(df["symbol"], df["last_ts"].astype("int64"))))
+
+    def rebuild(self) -> None:
+        """Re-derive every watermark from the last stored bar (one tail read per symbol)."""
+        self._last.clear()
+        for k in self.lib.list_symbols():
+            if k.startswith(BARS_PREFIX):
+                self.refresh(k[len(BARS_PREFIX):])
+        self._dirty = True
+
+    def refresh(self, symbol: str) -> None:
+        try:
+            tail = self.lib.tail(key_bars("1d", symbol), 1).data
+        except NoDataFoundException:
+            self._last.pop(symbol, None)
+            return
+        if len(tail):
+            self._last[symbol] = pd.Timestamp(tail.index[-1]).value
+        self._dirty = True
+
+    def get(self, symbol: str) -> pd.Timestamp | None:
+        ns = self._last.get(symbol)
+        return None if ns is None else pd.Timestamp(ns, tz="UTC")
+
+    def symbols(self) -> list[str]:
+        return sorted(self._last)
+
+    def last_ns(self, symbol: str) -> int | None:
+        return self._last.get(symbol)
+
+    def filter(self, symbol: str, bars: pd.DataFrame) -> pd.DataFrame:
+        """Rows of `bars` strictly after the symbol's watermark."""
+        ns = self._last.get(symbol)
+        if ns is None or bars.empty:
+            return bars
+        return bars.loc[bars.index.asi8 > ns]
+
+    def advance(self, symbol: str, bars: pd.DataFrame) -> None:
+        if bars.empty:
+            return
+        ns = int(bars.index.asi8.max())
+        if ns > self._last.get(symbol, ns - 1):
+            self._last[symbol] = ns
+            self._dirty = True
+
+    def apply(self, last: dict[str, int]) -> None:
+        """Overwrite watermarks with recorded values (see CheckpointJournal.replay)."""
+        if last:
+            self._last.update(last)
+            self._dirty = True
+
+    def reset(self, symbol: str, bars: pd.DataFrame) -> None:
+        """Set the watermark after a full rewrite of the symbol."""
+        if bars.empty:
+            self._last.pop(symbol, None)
+        else:
+            self._last[symbol] = int(bars.index.asi8.max())
+        self._dirty = True
+
+    def commit(self) -> None:
+        if not self._dirty:
+            return
+        df = pd.DataFrame({
+            "symbol": pd.Series(list(self._last.keys()), dtype="object"),
+            "last_ts": pd.Series(list(self._last.values()), dtype="int64"),
+        })
+        self.lib.write(self.key, df, prune_previous_versions=True)
+        self._dirty = False
+
+def repair_symbol(lib, symbol: str, watermarks: SymbolWatermarks | None = None) -> dict:
+    """
+    Full-history repair for one symbol: sort by timestamp, drop duplicate
+    timestamps (keeping the last written row) and rewrite if anything changed.
+    """
+    k = key_bars("1d", symbol)
+    df = lib.read(k).data
+    fixed = df.sort_index(kind="stable")
+    fixed = fixed[~fixed.index.duplicated(keep="last")]
+    changed = len(fixed) != len(df) or not df.index.is_monotonic_increasing
+    if changed:
+        lib.write(k, fixed, prune_previous_versions=True)
+    if watermarks is not None:
+        watermarks.reset(symbol, fixed)
+    return {"symbol": symbol, "rows": len(df), "duplicates_dropped": len(df) - len(fixed), "rewritten": changed}
+
+def merge_into_history(lib, symbol: str, bars: pd.DataFrame, watermarks: SymbolWatermarks | None = None) -> int:
+    """
+    Backfill-into-the-past path: merge `bars` into the symbol's full history
+    (existing rows win on equal timestamps) and rewrite it. Returns rows added.
+    """
+    k = key_bars("1d", symbol)
+    try:
+        existing = lib.read(k).data
+    except NoDataFoundException:
+        existing = bars.iloc[:0]
+    new = bars.loc[~bars.index.isin(existing.index)]
+    if new.empty:
+        return 0
+    merged = pd.concat([existing, new]).sort_index(kind="stable")
+    lib.write(k, merged, prune_previous_versions=True)
+    if watermarks is not None:
+        watermarks.reset(symbol, merged)
+    return len(new)
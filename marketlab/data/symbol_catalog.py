@@ -0,0 +1,209 @@
+# marketlab/data/symbol_catalog.py
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+from arcticdb.exceptions import NoDataFoundException
+
+from marketlab.calendar import previous_session
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import key_bars
+
+BARS_PREFIX = key_bars("1d", "")
+ADV_SPAN = 20  # sessions; exponentially weighted average of close * volume
+STALE_SESSIONS = 5  # no bar in the last N sessions of the store -> "inactive"
+
+_ALPHA = 2.0 / (ADV_SPAN + 1)
+_COLUMNS = ["symbol", "first_ts", "last_ts", "rows", "last_close", "adv", "status"]
+
+def symbols_key(cfg: MarketlabConfig) -> str:
+    return f"meta/symbols/{cfg.daily_symbol_set}"
+
+def _ew(prev: float | None, dv: np.ndarray) -> float | None:
+    """EW average of dollar volume `dv` (oldest first) continued from `prev`."""
+    dv = dv[np.isfinite(dv)]
+    if len(dv) == 0:
+        return prev
+    if prev is None or not np.isfinite(prev):
+        prev, dv = float(dv[0]), dv[1:]
+    n = len(dv)
+    w = _ALPHA * (1 - _ALPHA) ** np.arange(n - 1, -1, -1)
+    return float(prev * (1 - _ALPHA) ** n + (w * dv).sum())
+
+def _summary(bars: pd.DataFrame, prev: dict | None = None) -> dict:
+    """Stats of `bars` (sorted), continued from `prev` when the bars follow it."""
+    idx = bars.index.asi8
+    dv = (bars["close"].to_numpy(dtype="float64") * bars["volume"].to_numpy(dtype="float64"))
+    if prev is None:
+        return {"first_ts": int(idx[0]), "last_ts": int(idx[-1]), "rows": len(bars),
+                "last_close": float(bars["close"].iloc[-1]), "adv": _ew(None, dv)}
+    return {**prev, "last_ts": int(idx[-1]), "rows": prev["rows"] + len(bars),
+            "last_close": float(bars["close"].iloc[-1]), "adv": _ew(prev["adv"], dv)}
+
+class SymbolCatalog:
+    """
+    One row per bars/1d symbol: first/last bar timestamp, row count, last
+    close, EW average dollar volume (span ADV_SPAN) and a listing status, kept
+    in one catalog symbol (meta/symbols/{symbol_set}) so discovery and
+    universe filters are a single read instead of one read per key.
+
+    Like SymbolWatermarks it is updated in memory from the frames each write
+    batch stores and rewritten by commit(). Appends extend the stats
+    incrementally; rows written into the past (update mode) only extend
+    first/rows when they precede the stored history, otherwise the symbol is
+    re-summarized from its close/volume columns at commit. A store that
+    predates the catalog is bootstrapped once from every symbol's bars.
+    """
+
+    def __init__(self, lib, cfg: MarketlabConfig, rows: dict[str, dict] | None = None):
+        self.lib = lib
+        self.key = symbols_key(cfg)
+        self._rows: dict[str, dict] = dict(rows or {})
+        self._stale: set[str] = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, lib, cfg: MarketlabConfig) -> "SymbolCatalog":
+        try:
+            df = lib.read(symbols_key(cfg)).data
+        except NoDataFoundException:
+            cat = cls(lib, cfg)
+            cat.rebuild()
+            return cat
+        rows = {
+            r["symbol"]: {k: r[k] for k in ("first_ts", "last_ts", "rows", "last_close", "adv")}
+            for r in df.to_dict("records")
+        }
+        for r in rows.values():
+            r["first_ts"], r["last_ts"], r["rows"] = int(r["first_ts"]), int(r["last_ts"]), int(r["rows"])
+            r["adv"] = None if pd.isna(r["adv"]) else float(r["adv"])
+        return cls(lib, cfg, rows)
+
+    def rebuild(self) -> None:
+        """Re-summarize every bars/1d symbol from storage (close and volume columns only)."""
+        self._rows.clear()
+        for k in self.lib.list_symbols():
+            if k.startswith(BARS_PREFIX):
+                self.refresh(k[len(BARS_PREFIX):])
+        self._dirty = True
+
+    def refresh(self, symbol: str) -> None:
+        self._stale.discard(symbol)
+        try:
+            bars = self.lib.read(key_bars("1d", symbol), columns=["close", "volume"]).data
+        except NoDataFoundException:
+            bars = None
+        if bars is None or bars.empty:
+            self._rows.pop(symbol, None)
+        else:
+            if not bars.index.is_monotonic_increasing:
+                bars = bars.sort_index(kind="stable")
+            self._rows[symbol] = _summary(bars)
+        self._dirty = True
+
+    def mark_stale(self, symbols) -> None:
+        """Re-summarize these symbols from storage at the next commit()."""
+        self._stale.update(symbols)
+
+    def observe(self, symbol: str, bars: pd.DataFrame, mode: str) -> None:
+        """
+        Record `bars` just written for `symbol`; mode is "append", "update"
+        (date-range replace) or "rewrite" (the frame is the full history).
+        """
+        if bars.empty:
+            return
+        prev = self._rows.get(symbol)
+        if mode == "rewrite" or prev is None:
+            self._rows[symbol] = _summary(bars)
+        elif mode == "append" or bars.index.asi8[0] > prev["last_ts"]:
+            self._rows[symbol] = _summary(bars, prev)
+        elif mode == "update" and bars.index.asi8[-1] < prev["first_ts"]:
+            prev["first_ts"] = int(bars.index.asi8[0])
+            prev["rows"] += len(bars)
+        else:
+            self._stale.add(symbol)
+        self._dirty = True
+
+    def frame(self) -> pd.DataFrame:
+        """The catalog as a DataFrame indexed by symbol (first_date/last_date as UTC timestamps)."""
+        df = pd.DataFrame.from_dict(self._rows, orient="index", columns=_COLUMNS[1:6])
+        return _decorate(df)
+
+    def commit(self) -> None:
+        for symbol in sorted(self._stale):
+            self.refresh(symbol)
+        if not self._dirty:
+            return
+        df = self.frame()
+        out = pd.DataFrame({
+            "symbol": pd.Series(df.index, dtype="object"),
+            "first_ts": df["first_ts"].astype("int64").to_numpy(),
+            "last_ts": df["last_ts"].astype("int64").to_numpy(),
+            "rows": df["rows"].astype("int64").to_numpy(),
+            "last_close": df["last_close"].astype("float64").to_numpy(),
+            "adv": df["adv"].astype("float64").to_numpy(),
+            "status": df["status"].astype("object").to_numpy(),
+        })
+        self.lib.write(self.key, out, prune_previous_versions=True)
+        self._dirty = False
+
+def _decorate(df: pd.DataFrame) -> pd.DataFrame:
+    """Add first_date/last_date and the listing status (relative to the newest bar in the store)."""
+    df.index.name = "symbol"
+    df["first_date"] = pd.to_datetime(df["first_ts"].astype("int64"), utc=True)
+    df["last_date"] = pd.to_datetime(df["last_ts"].astype("int64"), utc=True)
+    df["status"] = pd.Series(dtype="object")
+    if len(df):
+        cutoff = df["last_date"].max().date()
+        for _ in range(STALE_SESSIONS - 1):
+            cutoff = previous_session(cutoff)
+        df["status"] = np.where(df["last_date"].dt.date >= cutoff, "active", "inactive")
+    return df
+
+def read_symbol_catalog(lib, cfg: MarketlabConfig) -> pd.DataFrame:
+    """The committed catalog as one DataFrame (see SymbolCatalog.frame); empty if never built."""
+    try:
+        df = lib.read(symbols_key(cfg)).data
+    except NoDataFoundException:
+        return _decorate(pd.DataFrame(columns=_COLUMNS[1:6]))
+    return _decorate(df.set_index("symbol").drop(columns=["status"]))
+
+def stored_symbols(lib, cfg: MarketlabConfig) -> list[str]:
+    """bars/1d symbols from the catalog, falling back to listing keys if it was never built."""
+    cat = read_symbol_catalog(lib, cfg)
+    if len(cat):
+        return sorted(cat.index)
+    return sorted(k[len(BARS_PREFIX):] for k in lib.list_symbols() if k.startswith(BARS_PREFIX))
+
+def universe(
+    catalog: pd.DataFrame,
+    *,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    min_price: float | None = None,
+    min_adv: float | None = None,
+    status: str | None = None,
+    top: int | None = None,
+) -> list[str]:
+    """
+    Symbols whose stored history overlaps [start, end], filtered on the last
+    close / ADV / status and optionally the `top` by ADV. Price and ADV are
+    the catalog's latest values, not point-in-time ones (use the wide panels
+    for those).
+    """
+    df = catalog
+    if start is not None:
+        df = df[df["last_date"].dt.date >= start]
+    if end is not None:
+        df = df[df["first_date"].dt.date <= end]
+    if min_price is not None:
+        df = df[df["last_close"] >= min_price]
+    if min_adv is not None:
+        df = df[df["adv"] >= min_adv]
+    if status is not None:
+        df = df[df["status"] == status]
+    if top is not None:
+        df = df.sort_values("adv", ascending=False).head(top)
+    return list(df.index)
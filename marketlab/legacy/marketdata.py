@@ -8,6 +8,7 @@ import os
 
 import arcticdb as adb
 import pandas as pd
+from arcticdb import QueryBuilder
 
 
 from pathlib import Path
@@ -47,33 +48,62 @@ def get_all() -> pd.DataFrame:
     lib = _get_lib()
     return lib.read(SYMBOL_NAME).data
 
-def get_all_filtered():
-    df = get_all()
-    tickers = df.index.get_level_values("ticker")
-    return df[~tickers.isin(EXCLUDE_SYMBOLS)]
+def get_all_filtered(columns: list[str] | None = None) -> pd.DataFrame:
+    """get_all() without EXCLUDE_SYMBOLS; the exclusion runs inside ArcticDB."""
+    q = QueryBuilder()
+    q = q[q["ticker"].isnotin(sorted(EXCLUDE_SYMBOLS))]
+    return _get_lib().read(SYMBOL_NAME, columns=columns, query_builder=q).data
 
-def get_ohlc(ticker: str, start: str | date | None = None,
-             end: str | date | None = None) -> pd.DataFrame:
+def _date_range(start, end):
     """
-    Return OHLCV for a single ticker, optional date range.
-    Index: DatetimeIndex (date).
+    Inclusive (start, end) for ArcticDB's date_range, matching .loc[start:end]
+    on the date level: a bare date or 'YYYY-MM-DD' end covers its whole day.
     """
-    df_all = get_all()
-    df = df_all.xs(ticker, level="ticker")  # select one ticker
-
-    if start is not None or end is not None:
-        df = df.loc[start:end]
+    if start is None and end is None:
+        return None
+    lo = None if start is None else pd.Timestamp(start)
+    hi = None
+    if end is not None:
+        hi = pd.Timestamp(end)
+        if isinstance(end, date) and not isinstance(end, datetime) or isinstance(end, str) and len(end) == 10:
+            hi += pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    return (lo, hi)
 
-    return df
+def get_ohlc(ticker: str, start: str | date | None = None,
+             end: str | date | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Return OHLCV for a single ticker, optional date range and columns.
+    Index: DatetimeIndex (date).
 
-def get_universe_on(date_str: str) -> pd.DataFrame:
+    The ticker filter, date range and column projection are pushed down to
+    ArcticDB, so only the matching rows are decoded instead of the whole table.
+    Raises KeyError for a ticker the table does not hold; a known ticker with
+    no rows in [start, end] gives an empty frame.
+    """
+    q = QueryBuilder()
+    q = q[q["ticker"] == ticker]
+    lib = _get_lib()
+    date_range = _date_range(start, end)
+    df = lib.read(SYMBOL_NAME, date_range=date_range, columns=columns, query_builder=q).data
+    # an empty range only means "unknown ticker" if the ticker has no rows at all (index-only probe)
+    if len(df) == 0 and (date_range is None or len(lib.read(SYMBOL_NAME, columns=[], query_builder=q).data) == 0):
+        raise KeyError(ticker)
+    return df.droplevel("ticker")
+
+def get_universe_on(date_str: str, columns: list[str] | None = None) -> pd.DataFrame:
     """
     All tickers for a given date.
     Index: ticker.
+
+    Reads only that day's rows (date_range pushdown); raises KeyError when the
+    table has no rows for the date.
     """
-    df_all = get_all()
-    day = df_all.loc[date_str]   # slice MultiIndex on date
-    return day.reset_index(level="ticker").set_index("ticker")
+    day = pd.Timestamp(date_str).normalize()
+    end = day + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    df = _get_lib().read(SYMBOL_NAME, date_range=(day, end), columns=columns).data
+    if df.empty:
+        raise KeyError(date_str)
+    return df.droplevel("date")
 
 def build_features(df):
     # df is MultiIndex (date, ticker) with columns close, volume, ...
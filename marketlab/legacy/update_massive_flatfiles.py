@@ -20,57 +20,60 @@ import pandas as pd
 import numpy as np
 
 import arcticdb as adb
-from dotenv import load_dotenv
 
-load_dotenv()  # loads .env if present
+from marketlab.calendar import iter_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import read_flatfile
+from marketlab.data.polygon_massive.retry import with_backoff
 
-# --- Massive / Polygon S3 config ---
-MASSIVE_S3_ACCESS_KEY = os.environ["MASSIVE_S3_ACCESS_KEY"]
-MASSIVE_S3_SECRET_KEY = os.environ["MASSIVE_S3_SECRET_KEY"]
-MASSIVE_API_KEY = os.environ["MASSIVE_API_KEY"]
+# Credentials, endpoint, store and history depth come from MarketlabConfig
+# (env / .env) when a function is called, so importing this module needs no
+# environment. .env is loaded by marketlab.config.
 
-S3_ENDPOINT = "https://files.massive.com"
 S3_BUCKET   = "flatfiles"
 DAY_AGGS_PREFIX = "us_stocks_sip/day_aggs_v1"   # as per docs :contentReference[oaicite:3]{index=3}
 
-# --- Local storage for flat files ---
+# --- Local storage for flat files (default; see local_base) ---
 LOCAL_BASE = Path("./massive_flatfiles/us_stocks_sip/day_aggs_v1")
 
-# --- ArcticDB config ---
-ARCTIC_URI  = "lmdb://./arcticdb_stock_store"
-LIB_NAME    = "daily_ohlc_all"
+# --- ArcticDB symbol holding the (date, ticker) panel ---
 SYMBOL_NAME = "us_stocks_day_aggs_v1"
 
 from datetime import date, timedelta
 
-MAX_YEARS_BACK = 5  # how many years the subscription allows
+def local_base(cfg: MarketlabConfig) -> Path:
+    return cfg.cache_dir / DAY_AGGS_PREFIX
 
-def compute_hist_start() -> date:
+def compute_hist_start(cfg: MarketlabConfig | None = None) -> date:
     """
     Compute the earliest date we should even *try* to download,
-    based on how many years of history the account has.
+    based on how many years of history the account has (cfg.max_years_back).
 
     We use 366 days/year to be safe around leap years.
     """
+    cfg = cfg or MarketlabConfig()
     today = date.today()
-    approx_days = MAX_YEARS_BACK * 366
+    approx_days = cfg.max_years_back * 366
     return today - timedelta(days=approx_days)
 
-def get_s3_client():
+def get_s3_client(cfg: MarketlabConfig | None = None):
+    cfg = cfg or MarketlabConfig()
+    access_key, secret_key = cfg.require_massive_s3_creds()
     session = boto3.Session(
-        aws_access_key_id=MASSIVE_S3_ACCESS_KEY,
-        aws_secret_access_key=MASSIVE_S3_SECRET_KEY,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
     )
     s3 = session.client(
         "s3",
-        endpoint_url="https://files.massive.com",
+        endpoint_url=cfg.massive_endpoint,
         config=Config(signature_version="s3v4"),
     )
     return s3
 
-def get_arctic_lib():
-    ac = adb.Arctic(ARCTIC_URI)
-    lib = ac.get_library(LIB_NAME, create_if_missing=True)
+def get_arctic_lib(cfg: MarketlabConfig | None = None):
+    cfg = cfg or MarketlabConfig()
+    ac = adb.Arctic(cfg.arctic_uri)
+    lib = ac.get_library(cfg.daily_lib, create_if_missing=True)
     return lib
 
 def get_last_date_in_arctic(lib) -> date | None:
@@ -90,12 +93,12 @@ def get_last_date_in_arctic(lib) -> date | None:
 
     return last_date
 
-def get_dates_to_update(lib, end_date: date) -> list[date]:
+def get_dates_to_update(lib, end_date: date, cfg: MarketlabConfig | None = None) -> list[date]:
     """
-    Return calendar dates we still need to download,
+    Return trading sessions we still need to download,
     from max(hist_start, last_seen+1) through end_date inclusive.
     """
-    hist_start = compute_hist_start()
+    hist_start = compute_hist_start(cfg)
     last_date = get_last_date_in_arctic(lib)
 
     if last_date is None or last_date < hist_start:
@@ -106,22 +109,22 @@ def get_dates_to_update(lib, end_date: date) -> list[date]:
     if cur > end_date:
         return []
 
-    dates = []
-    while cur <= end_date:
-        dates.append(cur)
-        cur += timedelta(days=1)
-    return dates
+    return list(iter_sessions(cur, end_date))
 
 def s3_key_for_date(d: date) -> str:
     return f"{DAY_AGGS_PREFIX}/{d.year:04d}/{d.month:02d}/{d.isoformat()}.csv.gz"
 
 
-def local_path_for_date(d: date) -> Path:
-    return LOCAL_BASE / f"{d.year:04d}" / f"{d.month:02d}" / f"{d.isoformat()}.csv.gz"
+def local_path_for_date(d: date, base: Path = LOCAL_BASE) -> Path:
+    return base / f"{d.year:04d}" / f"{d.month:02d}" / f"{d.isoformat()}.csv.gz"
 
-def ensure_local_file_for_date(s3, d: date) -> Path | None:
+def ensure_local_file_for_date(
+    s3, d: date, *, base: Path = LOCAL_BASE, bucket: str = S3_BUCKET, max_retries: int = 0
+) -> Path | None:
+    # Throttling / transient errors are retried here (with_backoff): the shared
+    # client from make_s3_client has botocore's own retries turned off.
     key = s3_key_for_date(d)
-    local_path = local_path_for_date(d)
+    local_path = local_path_for_date(d, base)
     local_path.parent.mkdir(parents=True, exist_ok=True)
 
     if local_path.exists():
@@ -130,7 +133,7 @@ def ensure_local_file_for_date(s3, d: date) -> Path | None:
 
     try:
         print(f"{d}: downloading {key} from S3 …")
-        s3.download_file(S3_BUCKET, key, str(local_path))
+        with_backoff(lambda: s3.download_file(bucket, key, str(local_path)), max_retries=max_retries)
         return local_path
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code")
@@ -142,13 +145,17 @@ def ensure_local_file_for_date(s3, d: date) -> Path | None:
         # Any other error is "real", so re-raise.
         raise
 
-def load_daily_df_from_file(path):
+def load_daily_df_from_file(path, *, use_sidecar: bool | None = None):
 
-    # Read ticker as string; don't auto-convert blanks/"NA"/etc. to NaN
-    df = pd.read_csv(path, compression="gzip", keep_default_na=False)
+    # Read ticker as string; don't auto-convert "NA"/etc. to NaN. Blank cells are NaN
+    # (a blank ticker is put back to "" below), so numeric columns stay numeric.
+    # Goes through the typed .arrow sidecar cache when one is current (cfg.flatfile_sidecars).
+    if use_sidecar is None:
+        use_sidecar = MarketlabConfig().flatfile_sidecars
+    df = read_flatfile(Path(path), use_sidecar=use_sidecar)
 
     # needed because some objects are being read as string[python] which arcticdb rejects:
-    df["ticker"] = df["ticker"].astype("object")
+    df["ticker"] = df["ticker"].fillna("").astype("object")
     # strip whitespace:
     df["ticker"] = df["ticker"].str.strip()
 
@@ -224,35 +231,49 @@ def append_daily_df_to_arctic(lib, df: pd.DataFrame):
     last_date = pd.to_datetime(last_idx[0]).date() if isinstance(last_idx, tuple) else pd.to_datetime(last_idx).date()
     print(f"Appended {len(df)} rows, last date in chunk: {last_date}")
 
-def update_all_days():
-    # Ken French data:
+def update_all_days(
+    cfg: MarketlabConfig | None = None, *, lib=None, s3=None, ken_french: bool = True
+) -> dict:
+    """
+    Ken French factors, then every missing day into SYMBOL_NAME. Pass `lib`
+    and `s3` to reuse an open Arctic library and S3 client.
+    """
+    cfg = cfg or MarketlabConfig()
 
-    try:
-        update_ken_french_factors("factors/ken_french")
-        print("Ken French factors updated.")
-    except Exception as e:
-        print("WARNING: Failed to update Ken French factors:", e)
+    # Ken French data:
+    if ken_french:
+        try:
+            update_ken_french_factors(str(cfg.kenfrench_dir))
+            print("Ken French factors updated.")
+        except Exception as e:
+            print("WARNING: Failed to update Ken French factors:", e)
 
     # polygon/massive data
-    s3  = get_s3_client()
-    lib = get_arctic_lib()
+    s3  = s3 if s3 is not None else get_s3_client(cfg)
+    lib = lib if lib is not None else get_arctic_lib(cfg)
 
     today = date.today()
     end_date = today - timedelta(days=1)
 
-    dates = get_dates_to_update(lib, end_date)
+    dates = get_dates_to_update(lib, end_date, cfg)
     if not dates:
         print("ArcticDB is already up to date (or before hist_start).")
-        return
+        return {"days": 0, "appended": 0, "rows": 0}
 
     print(f"Updating {len(dates)} day(s): {dates[0]} → {dates[-1]}")
 
+    appended = rows = 0
     for d in dates:
-        path = ensure_local_file_for_date(s3, d)
+        path = ensure_local_file_for_date(
+            s3, d, base=local_base(cfg), bucket=cfg.massive_bucket, max_retries=cfg.download_max_retries
+        )
         if path is None:
             continue
-        df = load_daily_df_from_file(path)
+        df = load_daily_df_from_file(path, use_sidecar=cfg.flatfile_sidecars)
         append_daily_df_to_arctic(lib, df)
+        appended += 1
+        rows += len(df)
+    return {"days": len(dates), "appended": appended, "rows": rows}
 
 
 
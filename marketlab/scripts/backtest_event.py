@@ -26,7 +26,7 @@ def main():
 
     cfg = MarketlabConfig()
     lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
-    df = read_bars(lib, args.timeframe, args.symbol).copy().sort_index()
+    df = read_bars(lib, args.timeframe, args.symbol)
 
     e = build_event(args.event)
     if args.regime:
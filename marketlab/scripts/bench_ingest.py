@@ -0,0 +1,94 @@
+"""
+Ingestion benchmarks on synthetic day_aggs_v1 flatfiles (no credentials needed):
+
+  python -m marketlab.scripts.bench_ingest --tickers 5000 --start 2024-01-01 --end 2024-03-31
+  python -m marketlab.scripts.bench_ingest ... --save-baseline        # record current numbers
+  python -m marketlab.scripts.bench_ingest ... --fail-on-regression   # compare against them
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sys
+import tempfile
+from pathlib import Path
+
+from marketlab.bench.ingest import CASES, compare_to_baseline, load_baseline, run_benchmarks, save_baseline
+from marketlab.bench.synthetic import SyntheticSpec
+from marketlab.data.polygon_massive.streaming import parse_size
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", default="2024-01-01", help="YYYY-MM-DD")
+    p.add_argument("--end", default="2024-02-29", help="YYYY-MM-DD")
+    p.add_argument("--tickers", type=int, default=2000)
+    p.add_argument("--missing-day", action="append", default=[], help="YYYY-MM-DD with no file (repeatable)")
+    p.add_argument("--missing-frac", type=float, default=0.0, help="fraction of sessions dropped at random")
+    p.add_argument("--delist-frac", type=float, default=0.05)
+    p.add_argument("--list-frac", type=float, default=0.05)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--case", action="append", choices=CASES, default=None, help="run only this case (repeatable)")
+    p.add_argument("--workers", type=int, default=2, help="decode processes for the backfill case")
+    p.add_argument("--max-memory", default="256MB", help="budget for the backfill_streaming case")
+    p.add_argument("--sidecars", action="store_true", help="pre-build Arrow sidecars and read through them")
+    p.add_argument("--workdir", default=None, help="keep data here instead of a temporary directory")
+    p.add_argument("--baseline", default="./.marketlab_bench/baseline.json")
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--tolerance", type=float, default=0.15)
+    p.add_argument("--fail-on-regression", action="store_true")
+    args = p.parse_args()
+
+    spec = SyntheticSpec(
+        start=parse_date(args.start),
+        end=parse_date(args.end),
+        n_tickers=args.tickers,
+        missing_days=tuple(parse_date(s) for s in args.missing_day),
+        missing_frac=args.missing_frac,
+        delist_frac=args.delist_frac,
+        list_frac=args.list_frac,
+        seed=args.seed,
+    )
+
+    tmp = None
+    if args.workdir:
+        root = Path(args.workdir)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="marketlab_bench_")
+        root = Path(tmp.name)
+    try:
+        report = run_benchmarks(
+            root, spec,
+            cases=args.case,
+            workers=args.workers,
+            max_memory=parse_size(args.max_memory),
+            sidecars=args.sidecars,
+        )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    print({"dataset": report["dataset"]})
+    for case, r in report["cases"].items():
+        print({"case": case, **r})
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_baseline(report, baseline_path)
+        print({"baseline_saved": str(baseline_path)})
+        return
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print({"baseline": None, "hint": "run with --save-baseline to record one"})
+        return
+    rows = compare_to_baseline(report, baseline, tolerance=args.tolerance)
+    for row in rows:
+        print(row)
+    if args.fail_on_regression and any(r["regression"] for r in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
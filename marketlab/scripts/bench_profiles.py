@@ -0,0 +1,50 @@
+"""
+Compare bar dtype profiles (float64 vs compact) on synthetic flatfiles:
+store size on disk and read latency.
+
+  python -m marketlab.scripts.bench_profiles --tickers 2000 --start 2023-01-01 --end 2023-12-31
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import tempfile
+from pathlib import Path
+
+from marketlab.bench.profiles import compare_profiles
+from marketlab.bench.synthetic import SyntheticSpec
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", default="2023-01-01", help="YYYY-MM-DD")
+    p.add_argument("--end", default="2023-12-31", help="YYYY-MM-DD")
+    p.add_argument("--tickers", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--read-symbols", type=int, default=200, help="symbols read back per latency measurement")
+    p.add_argument("--tail", type=int, default=300)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--workdir", default=None, help="keep data here instead of a temporary directory")
+    args = p.parse_args()
+
+    spec = SyntheticSpec(start=parse_date(args.start), end=parse_date(args.end), n_tickers=args.tickers, seed=args.seed)
+    tmp = None
+    if args.workdir:
+        root = Path(args.workdir)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="marketlab_bench_")
+        root = Path(tmp.name)
+    try:
+        report = compare_profiles(root, spec, read_symbols=args.read_symbols, tail=args.tail, repeats=args.repeats)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    print({"dataset": report["dataset"]})
+    for name, r in report["profiles"].items():
+        print({"profile": name, **r})
+
+if __name__ == "__main__":
+    main()
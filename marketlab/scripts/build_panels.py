@@ -0,0 +1,48 @@
+"""
+Build (or refresh) the wide date x ticker panels from cached flatfiles for
+days already in the ingest manifest, e.g. for a store ingested before
+panels existed. New ingests maintain the panels themselves.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import time
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic
+from marketlab.data.panels import PanelStore, get_panel_lib
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path, read_day_file
+from marketlab.data.polygon_massive.ingest_daily_monthly import days_in_month, month_range
+from marketlab.data.polygon_massive.session import IngestSession
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", required=True, help="YYYY-MM-DD")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD (default: today)")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    start = parse_date(args.start)
+    end = parse_date(args.end) if args.end else dt.date.today()
+    session = IngestSession.open(cfg)
+    panels = session.panels or PanelStore(get_panel_lib(get_arctic(cfg.arctic_uri), cfg.panel_lib))
+    cached = session.catalog.days(start, end)
+
+    for year, month in month_range(start, end):
+        t0 = time.perf_counter()
+        days = [d for d in days_in_month(year, month, start, end) if d in session.manifest and d in cached]
+        missing = session.catalog.drop_missing(days)
+        if missing:
+            print({"month": f"{year:04d}-{month:02d}", "missing_files": [str(d) for d in missing]})
+            days = [d for d in days if d not in missing]
+        for d in days:
+            panels.stage(read_day_file(flatfile_path(cfg, d), use_sidecar=cfg.flatfile_sidecars))
+        n = panels.flush()
+        print({"month": f"{year:04d}-{month:02d}", "sessions": n, "seconds": round(time.perf_counter() - t0, 3)})
+
+if __name__ == "__main__":
+    main()
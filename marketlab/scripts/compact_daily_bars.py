@@ -0,0 +1,77 @@
+"""
+Compact append-fragmented bars/1d symbols into large row slices:
+
+  python -m marketlab.scripts.compact_daily_bars --dry-run          # what would be compacted
+  python -m marketlab.scripts.compact_daily_bars --threshold 50     # symbols that lose >= 50 segments
+
+Only symbols over the threshold are touched, so repeated runs are
+incremental. Previous versions are pruned once the compacted version checks
+out; read latency is measured before/after on the --measure most fragmented.
+Run it between ingests: a symbol written during its compaction keeps all versions.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic, get_lib, key_bars
+from marketlab.data.compaction import compact_symbols, plan_compaction, time_reads
+from marketlab.data.symbol_catalog import stored_symbols
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", action="append", default=[], help="only this symbol (repeatable)")
+    p.add_argument("--threshold", type=int, default=50, help="minimum segments saved to compact a symbol")
+    p.add_argument("--rows-per-segment", type=int, default=None, help="target rows per slice (library default)")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--measure", type=int, default=20, help="time full reads before/after for the N most fragmented")
+    p.add_argument("--no-prune", action="store_true", help="keep previous versions")
+    p.add_argument("--dry-run", action="store_true")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
+    symbols = args.symbol or stored_symbols(lib, cfg)
+    keys = [key_bars("1d", s) for s in symbols]
+
+    t0 = time.perf_counter()
+    plans = plan_compaction(lib, keys, threshold=args.threshold, rows_per_segment=args.rows_per_segment, workers=args.workers)
+    print({
+        "symbols_checked": len(keys),
+        "to_compact": len(plans),
+        "segments_before": sum(pl.segments_before for pl in plans),
+        "segments_after": sum(pl.segments_after for pl in plans),
+        "plan_seconds": round(time.perf_counter() - t0, 3),
+    })
+    if args.dry_run:
+        for pl in plans[: args.measure]:
+            print({"symbol": pl.symbol, "segments_before": pl.segments_before, "segments_after": pl.segments_after})
+        return
+
+    sample = [pl.symbol for pl in plans[: args.measure]]
+    before = time_reads(lib, sample)
+
+    t0 = time.perf_counter()
+    done = failed = 0
+    for res in compact_symbols(
+        lib, plans, rows_per_segment=args.rows_per_segment, workers=args.workers, prune=not args.no_prune
+    ):
+        if res.error:
+            failed += 1
+            print(res.as_dict())
+        else:
+            done += 1
+    summary = {"compacted": done, "failed": failed, "seconds": round(time.perf_counter() - t0, 3)}
+
+    after = time_reads(lib, sample)
+    if sample:
+        summary["read_ms_median_before"] = round(statistics.median(before.values()) * 1000, 2)
+        summary["read_ms_median_after"] = round(statistics.median(after.values()) * 1000, 2)
+        total_after = sum(after.values())
+        summary["read_speedup"] = round(sum(before.values()) / total_after, 2) if total_after > 0 else None
+    print(summary)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Convert an existing store's bars/1d symbols (and wide panels) to another dtype profile:
+
+  python -m marketlab.scripts.convert_bar_profile --to compact --dry-run   # rows the cast would reject
+  python -m marketlab.scripts.convert_bar_profile --to compact
+  export MARKETLAB_BAR_PROFILE=compact                                     # then ingest as usual
+
+Ingestion refuses to open a store written under a different profile than
+MARKETLAB_BAR_PROFILE (see session.check_bar_profile). This rewrites every
+symbol under the new one. Going to compact stops before writing anything if
+some rows cannot be stored losslessly (see data/bar_profile.py) unless
+--drop-rejected is given. Symbols already in the target profile are skipped,
+so an interrupted run is finished by running it again. Run it between ingests.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic, get_lib, read_bars_many, write_bars_batch
+from marketlab.data.bar_profile import PROFILES, to_profile, upcast_bars
+from marketlab.data.panels import PANEL_FIELDS, get_panel_lib, key_panel
+from marketlab.data.polygon_massive.watermarks import SymbolWatermarks
+from marketlab.data.symbol_catalog import SymbolCatalog, stored_symbols
+
+CHUNK = 500  # symbols read per read_bars_many call
+
+def _pending(lib, symbols: list[str], profile: str):
+    """(symbol, float64 bars) for every symbol not yet stored under `profile`, a chunk at a time."""
+    for i in range(0, len(symbols), CHUNK):
+        for sym, df in read_bars_many(lib, "1d", symbols[i:i + CHUNK]).items():
+            stored = "compact" if df["close"].dtype == "float32" else "float64"
+            if stored != profile:
+                yield sym, upcast_bars(df)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--to", required=True, choices=PROFILES, help="target profile")
+    p.add_argument("--drop-rejected", action="store_true", help="compact: drop rows the cast would reject")
+    p.add_argument("--dry-run", action="store_true")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    arctic = get_arctic(cfg.arctic_uri)
+    lib = get_lib(arctic, cfg.daily_lib)
+    symbols = stored_symbols(lib, cfg)
+
+    t0 = time.perf_counter()
+    if args.dry_run or (args.to == "compact" and not args.drop_rejected):
+        todo = rejected = 0
+        by_symbol = {}
+        for sym, df in _pending(lib, symbols, args.to):
+            todo += 1
+            n = to_profile(df, args.to)[1]
+            if n:
+                rejected += n
+                by_symbol[sym] = n
+        print({"symbols": len(symbols), "to_convert": todo, "rows_rejected": rejected, "rejected_by_symbol": by_symbol})
+        if args.dry_run:
+            return
+        if rejected:
+            raise SystemExit("Some rows cannot be stored under the compact profile; rerun with --drop-rejected to drop them")
+
+    # rewrite each symbol; watermarks and the symbol catalog follow (rows may have been dropped)
+    watermarks = SymbolWatermarks.load(lib, cfg)
+    catalog = SymbolCatalog.load(lib, cfg)
+
+    seen, written = [], set()
+
+    def frames():
+        for sym, df in _pending(lib, symbols, args.to):
+            seen.append(sym)
+            yield sym, df
+
+    def committed(batch) -> None:
+        for sym, out in batch:
+            watermarks.reset(sym, out)
+            catalog.observe(sym, out, "rewrite")
+            written.add(sym)
+
+    res = write_bars_batch(
+        lib, "1d", frames(), upsert=True, profile=args.to, batch_size=cfg.ingest_batch_size, on_batch=committed,
+    )
+    watermarks.commit()
+    catalog.commit()
+
+    panels = 0
+    if cfg.wide_panels:
+        plib = get_panel_lib(arctic, cfg.panel_lib)
+        price_dtype = "float32" if args.to == "compact" else "float64"
+        for field in PANEL_FIELDS:
+            key = key_panel("1d", field)
+            if field == "volume" or not plib.has_symbol(key):
+                continue
+            plib.write(key, plib.read(key).data.astype(price_dtype), prune_previous_versions=True)
+            panels += 1
+
+    info = {
+        "profile": args.to,
+        "symbols_converted": res.symbols,
+        "rows": res.rows,
+        "panels_converted": panels,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+    if res.rejected:
+        info["rows_rejected"] = res.rejected
+    if res.failures:
+        info["failed_symbols"] = res.failures
+    # every row rejected: the symbol keeps its old profile (and ingest of it will fail) until it is fixed or deleted
+    left = [sym for sym in seen if sym not in written and sym not in res.failures]
+    if left:
+        info["not_converted"] = left
+    print(info)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from marketlab.calendar import iter_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.columnar_cache import convert_flatfile, iter_cached_flatfiles, require_pyarrow
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser(description="Pre-convert cached .csv.gz flatfiles to .arrow sidecars")
+    p.add_argument("--start", default=None, help="YYYY-MM-DD (default: whole cache)")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--force", action="store_true", help="rewrite sidecars that are already current")
+    args = p.parse_args()
+
+    require_pyarrow()
+    cfg = MarketlabConfig()
+
+    if args.start:
+        start = parse_date(args.start)
+        end = parse_date(args.end) if args.end else dt.date.today()
+        paths = [path for d in iter_sessions(start, end) if (path := flatfile_path(cfg, d)).exists()]
+    else:
+        paths = list(iter_cached_flatfiles(cfg.massive_cache_dir / cfg.daily_symbol_set))
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        written = sum(pool.map(convert_flatfile, paths, [args.force] * len(paths), chunksize=8))
+
+    print({
+        "files": len(paths),
+        "converted": written,
+        "already_current": len(paths) - written,
+        "seconds": round(time.perf_counter() - t0, 3),
+    })
+
+if __name__ == "__main__":
+    main()
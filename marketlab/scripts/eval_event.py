@@ -41,8 +41,7 @@ def main():
     cfg = MarketlabConfig()
     lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
 
-    df = read_bars(lib, args.timeframe, args.symbol).copy()
-    df = df.sort_index()
+    df = read_bars(lib, args.timeframe, args.symbol)
 
     # df["sma"] = sma(df["close"], args.sma)
     # event_mask = df["close"] > df["sma"]
@@ -7,7 +7,8 @@ from pathlib import Path
 import pandas as pd
 
 from marketlab.config import MarketlabConfig
-from marketlab.data.arctic import get_arctic, get_lib, read_bars
+from marketlab.data.arctic import get_arctic, get_lib, read_bars_many
+from marketlab.data.symbol_catalog import read_symbol_catalog, universe
 from marketlab.events.parser import build_event
 from marketlab.outcomes.forward import fwd_return
 from marketlab.research.evaluate import evaluate_event
@@ -17,6 +18,7 @@ from marketlab.events import AndEvent
 from marketlab.trading.signals import TradeSignal
 from marketlab.trading.returns import trade_returns_next_open_close_at_horizon
 
+READ_CHUNK = 500  # symbols per read_bars_many call
 
 
 def load_event_specs(events_file: str | None, events: list[str]) -> list[str]:
@@ -41,9 +43,37 @@ def load_event_specs(events_file: str | None, events: list[str]) -> list[str]:
     return out
 
 
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def select_symbols(args, lib, cfg: MarketlabConfig) -> list[str]:
+    """--symbol as given, else the symbol-catalog universe when any --universe-* filter is set, else SPY."""
+    if args.symbol:
+        return args.symbol
+    filters = (args.universe_start, args.universe_end, args.min_price, args.min_adv, args.top)
+    if not args.active_only and all(f is None for f in filters):
+        return ["SPY"]
+    return universe(
+        read_symbol_catalog(lib, cfg),
+        start=parse_date(args.universe_start) if args.universe_start else None,
+        end=parse_date(args.universe_end) if args.universe_end else None,
+        min_price=args.min_price,
+        min_adv=args.min_adv,
+        status="active" if args.active_only else None,
+        top=args.top,
+    )
+
+
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--symbol", default="SPY")
+    p.add_argument("--symbol", action="append", default=[], help="Symbol (repeatable; default SPY)")
+    p.add_argument("--universe-start", default=None, help="YYYY-MM-DD: symbols with bars on or after")
+    p.add_argument("--universe-end", default=None, help="YYYY-MM-DD: symbols with bars on or before")
+    p.add_argument("--min-price", type=float, default=None, help="Universe: last close at least")
+    p.add_argument("--min-adv", type=float, default=None, help="Universe: EW average dollar volume at least")
+    p.add_argument("--active-only", action="store_true", help="Universe: still listed")
+    p.add_argument("--top", type=int, default=None, help="Universe: keep the N largest by ADV")
     p.add_argument("--timeframe", default="1d")
     p.add_argument("--horizon", type=int, default=1, help="Forward bars")
     p.add_argument("--split", default="none", help="none | yearly | rolling:<window>:<step>")
@@ -66,8 +96,51 @@ def main():
 
     cfg = MarketlabConfig()
     lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
-    df = read_bars(lib, args.timeframe, args.symbol).copy().sort_index()
+    symbols = select_symbols(args, lib, cfg)
+    if not symbols:
+        raise ValueError("Universe filters matched no symbols")
+
+    all_rows = []
+    regime_specs = load_event_specs(args.regimes_file, args.regime)  # reuse your helper
+    if not regime_specs:
+        regime_specs = ["none"]
+    started = dt.datetime.now()
+
+    # batched reads, one chunk of the universe in memory at a time; symbols without bars are skipped
+    missing = []
+    for i in range(0, len(symbols), READ_CHUNK):
+        chunk = symbols[i:i + READ_CHUNK]
+        bars = read_bars_many(lib, args.timeframe, chunk)
+        missing.extend(s for s in chunk if s not in bars)
+        for symbol, df in bars.items():
+            all_rows.extend(evaluate_symbol(args, symbol, df, event_specs, regime_specs))
+
+    if missing:
+        print(f"No stored {args.timeframe} bars for {len(missing)} symbol(s), skipped: {', '.join(missing[:20])}"
+              + (" ..." if len(missing) > 20 else ""))
+    if not all_rows:
+        if len(missing) == len(symbols):
+            raise ValueError(f"No stored {args.timeframe} bars for any requested symbol: {', '.join(missing[:20])}")
+        raise ValueError("No results: the events produced no rows for the selected symbols")
+
+    result = pd.concat(all_rows, ignore_index=True)
+
+    # Save
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(args.out, index=False)
+
+    elapsed = dt.datetime.now() - started
+    print(f"Wrote {len(result)} rows for {len(symbols) - len(missing)} symbol(s) to {args.out} in {elapsed}.")
+
+    # Preview: show conditional rows only, sorted by sharpe
+    preview = result[result["slice"] == "conditional"].copy()
+    preview = preview.sort_values(["slice_name", "sharpe_ann"], ascending=[True, False])
 
+    with pd.option_context("display.max_columns", 60, "display.width", 160):
+        print(preview.head(args.limit_print))
+
+
+def evaluate_symbol(args, symbol: str, df: pd.DataFrame, event_specs: list[str], regime_specs: list[str]) -> list[pd.DataFrame]:
     # outcome series (same for all events)
     if args.trade:
         sig = TradeSignal(direction=+1 if args.direction == "long" else -1)
@@ -89,11 +162,6 @@ def main():
         raise ValueError("Invalid --split")
 
     all_rows = []
-    regime_specs = load_event_specs(args.regimes_file, args.regime)  # reuse your helper
-    if not regime_specs:
-        regime_specs = ["none"]
-    started = dt.datetime.now()
-
     for spec in event_specs:
         base_event = build_event(spec)
         base_mask = base_event.mask(df)
@@ -115,7 +183,7 @@ def main():
                 rr = r.loc[idx_mask]
 
                 out = evaluate_event(dd, mm, rr, timeframe=args.timeframe, horizon=args.horizon)
-                out.insert(0, "symbol", args.symbol)
+                out.insert(0, "symbol", symbol)
                 out.insert(1, "timeframe", args.timeframe)
                 out.insert(2, "horizon", args.horizon)
                 out.insert(3, "event_spec", spec)
@@ -126,21 +194,7 @@ def main():
 
                 all_rows.append(out)
 
-    result = pd.concat(all_rows, ignore_index=True)
-
-    # Save
-    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
-    result.to_csv(args.out, index=False)
-
-    elapsed = dt.datetime.now() - started
-    print(f"Wrote {len(result)} rows to {args.out} in {elapsed}.")
-
-    # Preview: show conditional rows only, sorted by sharpe
-    preview = result[result["slice"] == "conditional"].copy()
-    preview = preview.sort_values(["slice_name", "sharpe_ann"], ascending=[True, False])
-
-    with pd.option_context("display.max_columns", 60, "display.width", 160):
-        print(preview.head(args.limit_print))
+    return all_rows
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+"""
+Flatfile cache catalog maintenance:
+
+  --rebuild [--no-checksums]   re-derive the catalog from the cache directory (fixes drift)
+  --start/--end                report sessions with no cached file, and cached days not yet ingested
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.arctic import get_arctic, get_lib
+from marketlab.data.polygon_massive.cache_catalog import FlatfileCatalog
+from marketlab.data.polygon_massive.manifest import IngestManifest
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rebuild", action="store_true")
+    p.add_argument("--no-checksums", action="store_true", help="skip md5 of files not already in the catalog")
+    p.add_argument("--start", default=None, help="YYYY-MM-DD")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD (default: today)")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    catalog = FlatfileCatalog.for_config(cfg)
+
+    if args.rebuild:
+        manifest = IngestManifest.load(get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib), cfg)
+        ingested = list(manifest.stats().index.date) if len(manifest) else []
+        print({"rebuild": catalog.rebuild(checksums=not args.no_checksums, ingested=ingested)})
+
+    print({"catalog": str(catalog.path), "files": len(catalog.days()), "latest": str(catalog.latest_date())})
+
+    if args.start:
+        start = parse_date(args.start)
+        end = parse_date(args.end) if args.end else dt.date.today()
+        print({"missing_sessions": [str(d) for d in catalog.gaps(start, end)]})
+        print({"not_ingested": [str(d) for d in catalog.not_ingested(start, end)]})
+
+if __name__ == "__main__":
+    main()
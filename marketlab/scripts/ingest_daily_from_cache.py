@@ -1,35 +1,45 @@
 from __future__ import annotations
 import argparse
 import datetime as dt
+from dataclasses import replace
 
+from marketlab.calendar import iter_sessions
 from marketlab.config import MarketlabConfig
 from marketlab.data.polygon_massive.ingest_daily_from_cache import ingest_day
+from marketlab.data.polygon_massive.pipeline import day_batches, run_pipeline
+from marketlab.data.polygon_massive.session import IngestSession
 
 def parse_date(s: str) -> dt.date:
     return dt.datetime.strptime(s, "%Y-%m-%d").date()
 
-def daterange(start: dt.date, end: dt.date):
-    d = start
-    while d <= end:
-        yield d
-        d += dt.timedelta(days=1)
-
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--start", required=True)
     p.add_argument("--end", required=True)
     p.add_argument("--rewrite", action="store_true", help="rewrite symbols instead of append")
+    p.add_argument("--workers", type=int, default=1, help="decode processes (>1 uses a separate writer process)")
+    p.add_argument("--batch-size", type=int, default=None, help="symbols per ArcticDB batch write (default: config)")
     args = p.parse_args()
 
     cfg = MarketlabConfig()
+    if args.batch_size:
+        cfg = replace(cfg, ingest_batch_size=args.batch_size)
     start = parse_date(args.start)
     end = parse_date(args.end)
 
-    
+    if args.workers > 1:
+        batches = day_batches(cfg, iter_sessions(start, end))
+        for info in run_pipeline(cfg, batches, workers=args.workers, append=not args.rewrite):
+            print(info)
+        return
 
-    for day in daterange(start, end):
-        info = ingest_day(cfg, day, append=not args.rewrite)
-        print(info)
+    session = IngestSession.open(cfg)
+    try:
+        for day in iter_sessions(start, end):
+            info = ingest_day(cfg, day, append=not args.rewrite, session=session)
+            print(info)
+    finally:
+        session.commit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
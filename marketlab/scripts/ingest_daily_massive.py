@@ -3,7 +3,7 @@ from marketlab.data.polygon_massive.ingest_daily import run_legacy_daily_ingest
 
 def main():
     cfg = MarketlabConfig()
-    run_legacy_daily_ingest(cfg)
+    print(run_legacy_daily_ingest(cfg))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""
+Full-history maintenance for bars/1d, outside the watermark fast path:
+
+  --symbol X / --all       sort + drop duplicate timestamps, rewrite if needed
+  --start/--end            merge cached days into history (backfill before the watermark)
+  --rebuild-watermarks     re-derive every watermark from the stored bars
+  --rebuild-catalog        re-summarize every symbol in the symbol catalog
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+
+from marketlab.calendar import iter_sessions
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.ingest_daily_from_cache import flatfile_path, iter_symbol_slices, read_day_file
+from marketlab.data.polygon_massive.session import IngestSession
+from marketlab.data.polygon_massive.watermarks import merge_into_history, repair_symbol
+from marketlab.data.symbol_catalog import stored_symbols
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", action="append", default=[], help="symbol to dedupe (repeatable)")
+    p.add_argument("--all", action="store_true", help="dedupe every bars/1d symbol")
+    p.add_argument("--start", default=None, help="YYYY-MM-DD, merge cached days from here")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD")
+    p.add_argument("--rebuild-watermarks", action="store_true")
+    p.add_argument("--rebuild-catalog", action="store_true")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    session = IngestSession.open(cfg)
+    lib, wm = session.lib, session.watermarks
+
+    try:
+        if args.rebuild_watermarks:
+            wm.rebuild()
+            print({"watermarks_rebuilt": True})
+        if args.rebuild_catalog:
+            session.symbols.rebuild()
+            print({"symbol_catalog_rebuilt": True})
+
+        symbols = list(args.symbol)
+        if args.all:
+            symbols = stored_symbols(lib, cfg)
+        for sym in symbols:
+            info = repair_symbol(lib, sym, wm)
+            session.symbols.mark_stale([sym])
+            if info["rewritten"]:
+                print(info)
+
+        if args.start:
+            start = parse_date(args.start)
+            end = parse_date(args.end) if args.end else start
+            for d in iter_sessions(start, end):
+                path = flatfile_path(cfg, d)
+                if path.exists():
+                    df = read_day_file(path, use_sidecar=cfg.flatfile_sidecars)
+                    added = 0
+                    for sym, bars in iter_symbol_slices(df):
+                        n = merge_into_history(lib, sym, bars, wm)
+                        if n:
+                            added += n
+                            session.symbols.mark_stale([sym])
+                    session.stage_panels(df)
+                    session.manifest.mark(d, rows=len(df), symbols=df["ticker"].nunique())
+                    print({"date": str(d), "rows_added": added})
+    finally:
+        session.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Fill the flatfile cache recent-first: the latest --recent sessions at full
+speed (optionally ingested straight away), then history in the background
+under --bandwidth / --history-workers. Safe to interrupt and re-run.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.download_daily_flatfiles import print_progress
+from marketlab.data.polygon_massive.scheduler import DownloadScheduler, ingest_cached_days
+from marketlab.data.polygon_massive.session import IngestSession
+from marketlab.data.polygon_massive.streaming import parse_size
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", default=None, help="YYYY-MM-DD (default: max_years_back before today)")
+    p.add_argument("--recent", type=int, default=20, help="sessions fetched first, at full speed")
+    p.add_argument("--workers", type=int, default=None, help="concurrent downloads for the recent phase")
+    p.add_argument("--history-workers", type=int, default=2)
+    p.add_argument("--bandwidth", default=None, help="history cap per second, e.g. 5MB")
+    p.add_argument("--ingest", action="store_true", help="ingest recent days immediately, history when it is done")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    today = dt.date.today()
+    start = parse_date(args.start) if args.start else today - dt.timedelta(days=cfg.max_years_back * 366)
+
+    sched = DownloadScheduler(
+        cfg,
+        bucket=cfg.massive_bucket,
+        recent_sessions=args.recent,
+        workers=args.workers,
+        history_workers=args.history_workers,
+        bandwidth=parse_size(args.bandwidth) if args.bandwidth else None,
+    )
+    plan = sched.plan(start, today)
+    print({"recent": len(plan.recent), "history": len(plan.history), "missing_remote": plan.missing_remote})
+
+    recent, failed = sched.fetch_recent(plan, progress=print_progress)
+    print({"recent_downloaded": len(recent), "recent_failed": {str(d): e for d, e in failed.items()}})
+
+    session = IngestSession.open(cfg) if args.ingest else None
+    if session is not None:
+        for info in ingest_cached_days(session, [d for d in recent if d not in session.manifest]):
+            print("ingest:", info)
+
+    sched.start_history(plan)
+    try:
+        while not sched.join(timeout=10):
+            print({"history_downloaded": len(sched.history.downloaded), "of": len(plan.history)})
+    except KeyboardInterrupt:
+        sched.stop()
+        sched.join()
+        print({"stopped": True, "history_downloaded": len(sched.history.downloaded)})
+        return
+    print({
+        "history_downloaded": len(sched.history.downloaded),
+        "history_failed": {str(d): e for d, e in sched.history.failed.items()},
+    })
+
+    if session is not None:
+        pending = [d for d in session.catalog.days(start, today) if d not in session.manifest]
+        for info in ingest_cached_days(session, pending):
+            print("ingest:", info)
+
+if __name__ == "__main__":
+    main()
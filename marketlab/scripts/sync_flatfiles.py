@@ -0,0 +1,51 @@
+"""
+ETag/size-verified sync of the flatfile cache: fetch new days, re-fetch only
+days the vendor republished, and (with --reingest) replace those days in bars/1d.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+
+from marketlab.config import MarketlabConfig
+from marketlab.data.polygon_massive.download_daily_flatfiles import print_progress, sync_range
+from marketlab.data.polygon_massive.ingest_daily_from_cache import day_info, flatfile_path, reingest_day
+from marketlab.data.polygon_massive.session import IngestSession
+
+def parse_date(s: str) -> dt.date:
+    return dt.datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--start", required=True, help="YYYY-MM-DD")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD (default: today)")
+    p.add_argument("--workers", type=int, default=None, help="concurrent downloads (default: config)")
+    p.add_argument("--reingest", action="store_true", help="replace flagged days in bars/1d after syncing")
+    args = p.parse_args()
+
+    cfg = MarketlabConfig()
+    start = parse_date(args.start)
+    end = parse_date(args.end) if args.end else dt.date.today()
+
+    res = sync_range(cfg, bucket=cfg.massive_bucket, start=start, end=end, workers=args.workers, progress=print_progress)
+    print({
+        "checked": res.checked,
+        "unchanged": res.unchanged,
+        "new": [str(d) for d in res.new_days],
+        "changed": [str(d) for d in res.changed_days],
+        "flagged_for_reingest": [str(d) for d in res.reingest_days],
+        "missing_remote": res.missing_remote,
+        "failed": {str(d): e for d, e in res.failed.items()},
+        "months_listed": res.months_listed,
+    })
+
+    if args.reingest:
+        session = IngestSession.open(cfg)
+        try:
+            for day in session.catalog.needs_reingest(start, end):
+                print("reingest:", day_info(day, flatfile_path(cfg, day), reingest_day(session, day)))
+        finally:
+            session.commit()
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,66 @@ import argparse
 import datetime as dt
 
 from marketlab.config import MarketlabConfig
-from marketlab.data.polygon_massive.download_daily_flatfiles import update_to_latest_available, find_latest_local_date, iter_dates
-from marketlab.data.polygon_massive.ingest_daily_from_cache import ingest_day, flatfile_path
+from marketlab.data.polygon_massive.download_daily_flatfiles import update_to_latest_available, find_latest_local_date, iter_dates, print_progress
+from marketlab.data.polygon_massive.ingest_daily_from_cache import ingest_day
+from marketlab.data.polygon_massive.session import IngestSession
+from marketlab.data.polygon_massive.stream_ingest import stream_ingest_days
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--lookback-days", type=int, default=10)
+    p.add_argument("--workers", type=int, default=None, help="concurrent downloads (default: config)")
+    p.add_argument("--stream", action="store_true", help="decode S3 bodies straight into the ingest (no flatfile cache)")
+    p.add_argument("--tee", action="store_true", help="with --stream, also keep the downloaded files in the cache")
     args = p.parse_args()
 
     cfg = MarketlabConfig()
+    today = dt.date.today()
+
+    if args.stream:
+        # download and ingest overlap; the window starts from the manifest instead of the cache
+        session = IngestSession.open(cfg, catalog=args.tee)
+        latest = session.manifest.latest()
+        if latest is None:
+            start = today - dt.timedelta(days=cfg.max_years_back * 366)
+        else:
+            start = latest - dt.timedelta(days=args.lookback_days)
+        try:
+            for info in stream_ingest_days(
+                cfg, iter_dates(start, today), bucket=cfg.massive_bucket, session=session, workers=args.workers, tee=args.tee
+            ):
+                print("ingest:", info)
+        finally:
+            session.commit()
+        return
 
     # 1) download missing
-    dl = update_to_latest_available(cfg, lookback_days=args.lookback_days)
+    dl = update_to_latest_available(cfg, lookback_days=args.lookback_days, workers=args.workers, progress=print_progress)
     print("download:", dl)
 
     # 2) ingest anything local in the window that isn’t ingested yet
     latest = find_latest_local_date(cfg)
-    today = dt.date.today()
     if latest is None:
         start = today - dt.timedelta(days=cfg.max_years_back * 366)
     else:
         start = latest - dt.timedelta(days=args.lookback_days)
     end = today
 
-    for day in iter_dates(start, end):
-        path = flatfile_path(cfg, day)
-        if not path.exists():
-            continue
-        # ingest_day will skip instantly if manifest says already ingested
-        info = ingest_day(cfg, day, append=True)
-        if info.get("skipped"):
-            continue
-        print("ingest:", info)
+    session = IngestSession.open(cfg)
+    try:
+        cached = session.catalog.days(start, end)
+        pending = [d for d in iter_dates(start, end) if d not in session.manifest and d in cached]
+        missing = session.catalog.drop_missing(pending)
+        if missing:
+            print("missing from cache (dropped from catalog):", [str(d) for d in missing])
+        for day in pending:
+            if day in missing:
+                continue
+            info = ingest_day(cfg, day, append=True, session=session)
+            print("ingest:", info)
+    finally:
+        # one watermark + one manifest write for every day ingested in this run
+        session.commit()
 
     # from marketlab.data.arctic import get_arctic, get_lib, read_bars
     # lib = get_lib(get_arctic(cfg.arctic_uri), cfg.daily_lib)
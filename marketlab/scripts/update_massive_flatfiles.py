@@ -2,12 +2,13 @@ from __future__ import annotations
 import argparse
 
 from marketlab.config import MarketlabConfig
-from marketlab.data.polygon_massive.download_daily_flatfiles import update_to_latest_available
+from marketlab.data.polygon_massive.download_daily_flatfiles import print_progress, update_to_latest_available
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--lookback-days", type=int, default=10)
     p.add_argument("--overwrite", action="store_true")
+    p.add_argument("--workers", type=int, default=None, help="concurrent downloads (default: config)")
     args = p.parse_args()
 
     cfg = MarketlabConfig()
@@ -15,6 +16,8 @@ def main():
         cfg,
         lookback_days=args.lookback_days,
         overwrite=args.overwrite,
+        workers=args.workers,
+        progress=print_progress,
     )
     print(res)
 